@@ -2,16 +2,34 @@
 Coffee Shop System - Flask Application with Manim Animations
 Demonstrates stocks, flows, and feedback loops in a coffee shop system.
 """
-from flask import Flask, render_template, send_from_directory, url_for
+from flask import Flask, jsonify, render_template, request, send_from_directory, url_for
 import os
 import subprocess
 import sys
+import threading
+
+from render_scheduler import BATCH, INTERACTIVE, SLOT_DIR, RenderScheduler, SchedulerSaturated
+from run_store import INDEX_FILE, RunStore
 
 app = Flask(__name__)
 
 # Directory for rendered animations (Manim default output structure)
 MEDIA_DIR = os.path.join(os.path.dirname(__file__), 'media', 'videos', 'scenes', '480p15')
 
+# Vector (keyframe JSON) exports of the scenes, written by vector_export.py
+VECTOR_DIR = os.path.join(os.path.dirname(__file__), 'media', 'vector')
+
+# Monte Carlo datasets written by run_store.py
+RUNS_DIR = os.path.join(os.path.dirname(__file__), 'media', 'runs')
+
+# Largest number of values a single /runs request may return
+MAX_RUN_POINTS = 200_000
+
+# Caps concurrent Manim processes (machine-wide, shared with batch_render.py);
+# render times are remembered across restarts
+scheduler = RenderScheduler(stats_path=os.path.join(os.path.dirname(__file__), 'media', 'render_costs.json'),
+                            slot_dir=SLOT_DIR)
+
 # Animation metadata
 ANIMATIONS = {
     'stocks-flows': {
@@ -59,6 +77,86 @@ def render_animation(scene_name):
     return video_path
 
 
+def export_vector(scene_name):
+    """Export a scene's vector animation if it doesn't exist (no video encoding)."""
+    json_path = os.path.join(VECTOR_DIR, f'{scene_name}.json')
+    
+    if not os.path.exists(json_path):
+        print(f"Exporting {scene_name} as vector animation...")
+        
+        result = subprocess.run([
+            sys.executable, 'vector_export.py',
+            scene_name,
+            json_path
+        ], cwd=os.path.dirname(__file__), capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            print(f"Vector export error: {result.stderr}")
+            raise Exception(f"Failed to export {scene_name}: {result.stderr}")
+        
+        print(f"Exported {scene_name} successfully!")
+    
+    return json_path
+
+
+def schedule_render(scene_name, priority=INTERACTIVE):
+    """Render a scene through the scheduler; cached videos skip the queue."""
+    video_path = os.path.join(MEDIA_DIR, f'{scene_name}.mp4')
+    if os.path.exists(video_path):
+        return video_path
+    return scheduler.run(scene_name, lambda: render_animation(scene_name), priority)
+
+
+def prerender_animations():
+    """Queue every animation as low-priority background work."""
+    def prerender(scene_name):
+        try:
+            schedule_render(scene_name, priority=BATCH)
+        except Exception as e:
+            print(f"Pre-render of {scene_name} skipped: {e}")
+    
+    for anim_info in ANIMATIONS.values():
+        threading.Thread(target=prerender, args=(anim_info['scene'],), daemon=True).start()
+
+
+# Open run stores, reopened when their index changes (e.g. while still being written)
+_run_stores = {}
+
+
+def open_run_store(name):
+    """Memory-mapped RunStore for a dataset name, or None if it doesn't exist."""
+    # Only names that are actual datasets, never paths
+    if not os.path.isdir(RUNS_DIR) or name not in os.listdir(RUNS_DIR):
+        return None
+    index_path = os.path.join(RUNS_DIR, name, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return None
+    mtime = os.path.getmtime(index_path)
+    cached = _run_stores.get(name)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, RunStore(os.path.join(RUNS_DIR, name)))
+        _run_stores[name] = cached
+    return cached[1]
+
+
+def parse_runs(value, n_runs):
+    """
+    Parse a run selector: '7' for one run, '0:100' for a range, empty for all.
+    Raises ValueError unless it selects at least one of the n_runs stored runs.
+    """
+    if not value:
+        first, last = 0, n_runs
+    elif ':' in value:
+        start, stop = value.split(':', 1)
+        first, last = int(start) if start else 0, int(stop) if stop else n_runs
+    else:
+        first = int(value)
+        last = first + 1
+    if not 0 <= first < last <= n_runs:
+        raise ValueError(f"Run selection {first}:{last} is empty or outside the {n_runs} stored runs")
+    return slice(first, last)
+
+
 @app.route('/')
 def index():
     """Home page with navigation to all animations."""
@@ -73,19 +171,106 @@ def animation(animation_id):
     
     anim_info = ANIMATIONS[animation_id]
     scene_name = anim_info['scene']
+    vector = request.args.get('format') == 'vector'
+    video_url = vector_url = None
     
     # Render the animation if needed
     try:
-        render_animation(scene_name)
-        video_url = url_for('serve_video', filename=f'{scene_name}.mp4')
+        if vector:
+            json_name = f'{scene_name}.json'
+            if not os.path.exists(os.path.join(VECTOR_DIR, json_name)):
+                scheduler.run(json_name, lambda: export_vector(scene_name))
+            vector_url = url_for('serve_vector', filename=json_name, v=artifact_version(scene_name, vector))
+        else:
+            schedule_render(scene_name)
+            # Versioned URL so a re-rendered video isn't served from the browser cache
+            video_url = url_for('serve_video', filename=f'{scene_name}.mp4', v=artifact_version(scene_name, vector))
+    except SchedulerSaturated as e:
+        # Too many renders queued: ask the browser to come back later
+        print(f"Render queue full, deferring {scene_name}")
+        page = render_template('animation.html',
+                               animation=anim_info,
+                               animation_id=animation_id,
+                               video_url=None,
+                               vector=vector,
+                               retry_after=e.retry_after)
+        return page, 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
-        video_url = None
         print(f"Error rendering animation: {e}")
     
     return render_template('animation.html', 
                           animation=anim_info,
                           animation_id=animation_id,
-                          video_url=video_url)
+                          video_url=video_url,
+                          vector=vector,
+                          vector_url=vector_url)
+
+
+def artifact_version(scene_name, vector=False):
+    """Modification time of a scene's rendered video (or vector export), or None."""
+    path = os.path.join(VECTOR_DIR, f'{scene_name}.json') if vector else os.path.join(MEDIA_DIR, f'{scene_name}.mp4')
+    return int(os.path.getmtime(path) * 1000) if os.path.exists(path) else None
+
+
+@app.route('/animation/<animation_id>/version')
+def animation_version(animation_id):
+    """Current artifact version; dev pages poll this to reload after a re-render."""
+    if animation_id not in ANIMATIONS:
+        return "Animation not found", 404
+    vector = request.args.get('format') == 'vector'
+    return jsonify(version=artifact_version(ANIMATIONS[animation_id]['scene'], vector))
+
+
+@app.route('/vector/<path:filename>')
+def serve_vector(filename):
+    """Serve exported vector animations, gzipped when the browser accepts it."""
+    if 'gzip' in request.accept_encodings and os.path.exists(os.path.join(VECTOR_DIR, f'{filename}.gz')):
+        response = send_from_directory(VECTOR_DIR, f'{filename}.gz', mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = send_from_directory(VECTOR_DIR, filename)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@app.route('/runs/<name>')
+def run_dataset(name):
+    """Describe a simulation dataset."""
+    store = open_run_store(name)
+    if store is None:
+        return "Dataset not found", 404
+    return jsonify(store.index)
+
+
+@app.route('/runs/<name>/<stock>')
+def run_values(name, stock):
+    """
+    Slice a stock from a simulation dataset.
+    Query args: runs ('7' or '0:100'), start/end (hours), stat ('values' or 'quantiles').
+    """
+    store = open_run_store(name)
+    if store is None:
+        return "Dataset not found", 404
+    try:
+        runs = parse_runs(request.args.get('runs'), store.n_runs)
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        times = store.times(start, end)
+        
+        # Checked before touching the data: quantiles copy the whole selection too
+        size = (runs.stop - runs.start) * len(times)
+        if size > MAX_RUN_POINTS:
+            return f"Selection has {size} values; narrow runs or time window (max {MAX_RUN_POINTS})", 400
+        
+        if request.args.get('stat', 'values') == 'quantiles':
+            qs = (0.1, 0.5, 0.9)
+            values = store.quantiles(stock, qs, runs, start, end)
+            return jsonify(times=times.tolist(), quantiles={str(q): row.tolist() for q, row in zip(qs, values)})
+        
+        values = store.select(stock, runs, start, end)
+    except ValueError as e:
+        return str(e), 400
+    return jsonify(times=times.tolist(), first_run=runs.start, values=values.tolist())
 
 
 @app.route('/media/<path:filename>')
@@ -100,4 +285,11 @@ if __name__ == '__main__':
     print("Starting Flask server...")
     print("Open http://localhost:5000 in your browser")
     print("=" * 40)
+    # The debug reloader runs this block twice; only pre-render in the serving child
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        if '--prerender' in sys.argv:
+            prerender_animations()
+        if '--watch' in sys.argv:
+            from dev_watch import SceneWatcher
+            SceneWatcher(scheduler).start()
     app.run(debug=True, port=5000)
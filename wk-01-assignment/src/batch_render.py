@@ -0,0 +1,165 @@
+"""
+Batch Renderer for Coffee Shop Scene Specs
+Renders many scene-spec variants (e.g. one per franchise location) concurrently,
+at batch priority in the render slots shared with the web app.
+Specs are deduplicated by hash, so identical variants render only once and
+previously rendered variants are skipped. The hash also covers the scene code,
+so editing scenes.py re-renders every variant.
+
+Usage:
+    python batch_render.py specs/ --workers 4
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from render_scheduler import BATCH, SLOT_DIR, RenderScheduler, default_concurrency
+from scene_specs import load_spec, scene_attributes, spec_files, spec_hash
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Generated scene modules, one per unique spec
+SPEC_MODULE_DIR = os.path.join(BASE_DIR, 'media', 'specs')
+
+# Manim quality flag -> output subdirectory
+QUALITIES = {
+    'l': '480p15',
+    'm': '720p30',
+    'h': '1080p60',
+}
+
+SCENE_CLASS = 'SpecScene'
+
+MODULE_TEMPLATE = '''"""Generated by batch_render.py from {source}. Do not edit."""
+import json
+
+from scene_specs import compile_spec
+
+{class_name} = compile_spec(json.loads({spec_json!r}), {class_name!r})
+'''
+
+
+def video_path(digest, quality='l'):
+    """Where Manim writes the video for a spec hash."""
+    return os.path.join(BASE_DIR, 'media', 'videos', digest, QUALITIES[quality], f'{SCENE_CLASS}.mp4')
+
+
+def write_spec_module(spec, digest, source):
+    """Write the scene module Manim renders for a spec; returns its path."""
+    os.makedirs(SPEC_MODULE_DIR, exist_ok=True)
+    module_path = os.path.join(SPEC_MODULE_DIR, f'{digest}.py')
+    spec_json = json.dumps(spec, sort_keys=True, ensure_ascii=False)
+    with open(module_path, 'w', encoding='utf-8') as f:
+        f.write(MODULE_TEMPLATE.format(source=source, class_name=SCENE_CLASS, spec_json=spec_json))
+    return module_path
+
+
+def render_spec(spec, digest, source, quality='l', scheduler=None):
+    """
+    Render one spec with Manim unless its video already exists.
+    With a scheduler, the render waits for a slot at batch priority.
+    """
+    output = video_path(digest, quality)
+    if os.path.exists(output):
+        return output, False
+
+    def render():
+        module_path = write_spec_module(spec, digest, source)
+        result = subprocess.run([
+            sys.executable, '-m', 'manim', 'render',
+            f'-q{quality}',
+            module_path,
+            SCENE_CLASS
+        ], cwd=BASE_DIR, capture_output=True, text=True)
+
+        if result.returncode != 0:
+            raise Exception(f"Failed to render {source}: {result.stderr}")
+
+    if scheduler is None:
+        render()
+    else:
+        scheduler.run(digest, render, BATCH)
+    return output, True
+
+
+def collect_specs(paths):
+    """
+    Load and validate every spec, grouping identical specs by hash.
+    Returns {hash: (spec, [source paths])}; invalid specs are reported and skipped.
+    """
+    unique = {}
+    for path in spec_files(paths):
+        try:
+            spec = load_spec(path)
+            scene_attributes(spec)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        digest = spec_hash(spec)
+        if digest in unique:
+            unique[digest][1].append(path)
+        else:
+            unique[digest] = (spec, [path])
+    return unique
+
+
+def render_batch(paths, workers=None, quality='l'):
+    """
+    Render all specs under paths concurrently.
+    Returns {source path: video path} for every spec that rendered (or was cached).
+    """
+    unique = collect_specs(paths)
+    workers = workers or default_concurrency()
+    # Renders take machine-wide slots, leaving one free for page views of a
+    # running app; one thread per slot keeps the local queue short
+    scheduler = RenderScheduler(workers, max_queue=2 * workers, slot_dir=SLOT_DIR)
+    results = {}
+    rendered = cached = failed = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_spec, spec, digest, sources[0], quality, scheduler): digest
+            for digest, (spec, sources) in unique.items()
+        }
+        for future in as_completed(futures):
+            digest = futures[future]
+            sources = unique[digest][1]
+            try:
+                output, fresh = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"Error rendering {', '.join(sources)}: {e}")
+                continue
+            if fresh:
+                rendered += 1
+            else:
+                cached += 1
+            for source in sources:
+                results[source] = output
+
+    total = sum(len(sources) for _, sources in unique.values())
+    print(f"{total} specs -> {len(unique)} unique: "
+          f"{rendered} rendered, {cached} cached, {failed} failed")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render scene-spec variants in parallel.")
+    parser.add_argument('paths', nargs='+', help="Spec files or directories of specs")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Concurrent Manim processes, within the machine-wide limit "
+                             "(default: based on cores and RAM)")
+    parser.add_argument('--quality', choices=sorted(QUALITIES), default='l',
+                        help="Manim quality flag (default: l, 480p15)")
+    args = parser.parse_args(argv)
+
+    results = render_batch(args.paths, workers=args.workers, quality=args.quality)
+    for source, output in sorted(results.items()):
+        print(f"{source} -> {os.path.relpath(output, BASE_DIR)}")
+
+
+if __name__ == '__main__':
+    main()
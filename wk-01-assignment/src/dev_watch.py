@@ -0,0 +1,198 @@
+"""
+Watch-Mode Dev Renderer for scenes.py
+Polls scenes.py, compares class-level ASTs with the previous version and
+re-renders only the Scene subclasses that changed, in the background. Each
+changed scene gets a fast low-frame-rate preview first, then the normal render.
+Open animation pages (in debug mode) reload when the new video lands.
+
+Usage:
+    python dev_watch.py              # standalone, next to a running app.py
+    python app.py --watch            # inside the dev server
+"""
+import ast
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from render_scheduler import INTERACTIVE, SLOT_DIR, RenderScheduler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENES_FILE = os.path.join(BASE_DIR, 'scenes.py')
+
+# Where the app serves videos from (Manim's -ql output for scenes.py)
+MEDIA_DIR = os.path.join(BASE_DIR, 'media', 'videos', 'scenes', '480p15')
+VECTOR_DIR = os.path.join(BASE_DIR, 'media', 'vector')
+
+# Frame rates of the preview and full (-ql) renders; Manim names its output
+# folder 480p<fps> after them
+PREVIEW_FPS = 5
+FULL_FPS = 15
+
+POLL_SECONDS = 0.5
+
+
+def scene_fingerprints(source):
+    """
+    Hash of every Scene subclass in source. A class's hash covers its own AST,
+    its in-file base classes and the module-level code outside classes, so an
+    edit to a shared helper or import marks every scene that could see it.
+    """
+    tree = ast.parse(source)
+    classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+    module_code = ast.dump(ast.Module(
+        body=[node for node in tree.body if not isinstance(node, ast.ClassDef)], type_ignores=[]))
+
+    def base_names(node):
+        return [base.id if isinstance(base, ast.Name) else getattr(base, 'attr', '') for base in node.bases]
+
+    def is_scene(name, seen=()):
+        node = classes.get(name)
+        if node is None or name in seen:
+            return False
+        return any(base.endswith('Scene') and base not in classes or is_scene(base, seen + (name,))
+                   for base in base_names(node))
+
+    fingerprints = {}
+
+    def fingerprint(name):
+        if name not in fingerprints:
+            node = classes[name]
+            parts = [ast.dump(node), module_code]
+            parts += [fingerprint(base) for base in base_names(node) if base in classes]
+            fingerprints[name] = hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+        return fingerprints[name]
+
+    return {name: fingerprint(name) for name in classes if is_scene(name)}
+
+
+def changed_scenes(old, new):
+    """Scene names that are new or whose fingerprint differs."""
+    return sorted(name for name, digest in new.items() if old.get(name) != digest)
+
+
+def render_scene(scene_name, preview=False, is_current=None):
+    """
+    Render scene_name at low quality (or preview frame rate) and publish it to
+    MEDIA_DIR. If is_current is given it is checked just before publishing, and
+    a render it rejects is dropped; returns whether the video was published.
+    """
+    # Render into a scratch media dir on the same filesystem, so the app never
+    # serves a half-written file and the finished video can be swapped in atomically
+    scratch_dir = tempfile.mkdtemp(prefix='.dev-render-', dir=os.path.join(BASE_DIR, 'media'))
+    try:
+        command = [sys.executable, '-m', 'manim', 'render', '-ql', '--media_dir', scratch_dir]
+        if preview:
+            command += ['--fps', str(PREVIEW_FPS)]
+        command += [SCENES_FILE, scene_name]
+
+        result = subprocess.run(command, cwd=BASE_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"Failed to render {scene_name}: {result.stderr[-2000:]}")
+
+        if is_current is not None and not is_current():
+            return False  # Superseded while rendering; never overwrite a newer video
+        quality = f'480p{PREVIEW_FPS if preview else FULL_FPS}'
+        os.makedirs(MEDIA_DIR, exist_ok=True)
+        os.replace(os.path.join(scratch_dir, 'videos', 'scenes', quality, f'{scene_name}.mp4'),
+                   os.path.join(MEDIA_DIR, f'{scene_name}.mp4'))
+        return True
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+class SceneWatcher:
+    """Polls scenes.py and re-renders changed scenes in background threads."""
+
+    def __init__(self, scheduler=None, path=SCENES_FILE, poll_seconds=POLL_SECONDS):
+        self.scheduler = scheduler or RenderScheduler(slot_dir=SLOT_DIR)
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._mtime = None
+        self._fingerprints = {}
+        self._generation = {}  # scene -> edit counter, so stale renders are dropped
+        self._lock = threading.Lock()
+
+    def _read_fingerprints(self):
+        with open(self.path, encoding='utf-8') as f:
+            return scene_fingerprints(f.read())
+
+    def start(self):
+        """Take the current file as the baseline and watch from a daemon thread."""
+        self._mtime = os.path.getmtime(self.path)
+        self._fingerprints = self._read_fingerprints()
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+    def run(self):
+        print(f"Watching {os.path.relpath(self.path, BASE_DIR)} for scene changes...")
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                continue  # Editors may briefly remove the file while saving
+            if mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            self.check()
+
+    def check(self):
+        """Diff the file against the last version and queue renders for changed scenes."""
+        try:
+            fingerprints = self._read_fingerprints()
+        except SyntaxError as e:
+            print(f"scenes.py has a syntax error (line {e.lineno}), waiting for the next save")
+            return []
+        changed = changed_scenes(self._fingerprints, fingerprints)
+        self._fingerprints = fingerprints
+        for scene_name in changed:
+            self.queue(scene_name)
+        return changed
+
+    def queue(self, scene_name):
+        with self._lock:
+            generation = self._generation.get(scene_name, 0) + 1
+            self._generation[scene_name] = generation
+
+        # The old vector export no longer matches; it is re-exported on next view
+        for name in (f'{scene_name}.json', f'{scene_name}.json.gz'):
+            try:
+                os.remove(os.path.join(VECTOR_DIR, name))
+            except FileNotFoundError:
+                pass
+
+        print(f"{scene_name} changed, re-rendering (preview first)")
+        threading.Thread(target=self._render, args=(scene_name, generation), daemon=True).start()
+
+    def _current(self, scene_name, generation):
+        with self._lock:
+            return self._generation[scene_name] == generation
+
+    def _render(self, scene_name, generation):
+        for preview in (True, False):
+            if not self._current(scene_name, generation):
+                return  # Edited again; a newer render has been queued
+            label = 'preview' if preview else 'full'
+            start = time.monotonic()
+            # The generation keeps a newer edit from joining this render's queue entry
+            key = f'{scene_name}:{label}:{generation}'
+            try:
+                published = self.scheduler.run(key, lambda: render_scene(
+                    scene_name, preview, lambda: self._current(scene_name, generation)),
+                    INTERACTIVE, cost_key=f'{scene_name}:{label}')
+            except Exception as e:
+                print(f"{scene_name} {label} render failed: {e}")
+                return
+            if not published:
+                return
+            print(f"{scene_name} {label} render done in {time.monotonic() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    SceneWatcher().start().join()
@@ -0,0 +1,296 @@
+"""
+Load Testing Harness for the Coffee Shop Flask App
+Simulates viewer traffic against /, /animation/<id> and /media/<file> and reports
+latency percentiles, throughput, error rates and render counts.
+
+By default the app is served in-process on a local port. With --stub, Manim is
+replaced by a fake renderer that sleeps and writes a placeholder video into a
+temporary directory, so the harness runs anywhere and never touches real media.
+
+Usage:
+    python load_test.py --stub --concurrency 16 --requests 200
+    python load_test.py --stub --workload range-seek --render-delay 0.5
+    python load_test.py --url http://localhost:5000 --workload warm
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from werkzeug.serving import make_server
+
+import app as coffee_app
+from render_scheduler import RenderScheduler
+
+WORKLOADS = ('warm', 'cold', 'same-scene', 'range-seek')
+
+# Size of the placeholder video written by the stub renderer
+STUB_VIDEO_BYTES = 512 * 1024
+
+
+class RenderCounter:
+    """Wraps the app's render function and counts how often it actually runs."""
+
+    def __init__(self, render):
+        self.render = render
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, scene_name):
+        with self._lock:
+            self.count += 1
+        return self.render(scene_name)
+
+
+def stub_renderer(media_dir, delay):
+    """Fake render_animation: waits like Manim would and writes a dummy MP4."""
+    def render(scene_name):
+        time.sleep(delay)
+        video_path = os.path.join(media_dir, f'{scene_name}.mp4')
+        tmp_path = f'{video_path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(os.urandom(STUB_VIDEO_BYTES))
+        os.replace(tmp_path, video_path)
+        return video_path
+    return render
+
+
+class LocalServer:
+    """Serves the Flask app on a free local port in a background thread."""
+
+    def __init__(self):
+        self.server = make_server('127.0.0.1', 0, coffee_app.app, threaded=True)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+
+
+def fetch(url, headers=None):
+    """GET url; returns (status, latency seconds, bytes read)."""
+    request = urllib.request.Request(url, headers=headers or {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            body = response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        return None, time.perf_counter() - start, 0
+    return status, time.perf_counter() - start, len(body)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class LoadTest:
+    """Drives one workload at a time and collects the results."""
+
+    def __init__(self, base_url, concurrency, requests, media_dir=None, counter=None):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.requests = requests
+        self.media_dir = media_dir
+        self.counter = counter
+        self.animation_ids = list(coffee_app.ANIMATIONS)
+        self.scenes = [anim['scene'] for anim in coffee_app.ANIMATIONS.values()]
+
+    # ---------- request plans ----------
+
+    def _page_urls(self):
+        urls = [f'{self.base_url}/'] + [f'{self.base_url}/animation/{id}' for id in self.animation_ids]
+        return [(random.choice(urls), None) for _ in range(self.requests)]
+
+    def _same_scene_urls(self):
+        url = f'{self.base_url}/animation/{random.choice(self.animation_ids)}'
+        return [(url, None) for _ in range(self.requests)]
+
+    def _range_urls(self):
+        sizes = self._video_sizes()
+        plan = []
+        for _ in range(self.requests):
+            scene = random.choice(list(sizes))
+            size = sizes[scene]
+            # Seek somewhere in the video and read a chunk, like a player scrubbing
+            start = random.randrange(0, size)
+            end = min(start + random.randrange(16 * 1024, 256 * 1024), size - 1)
+            plan.append((f'{self.base_url}/media/{scene}.mp4', {'Range': f'bytes={start}-{end}'}))
+        return plan
+
+    def _video_sizes(self):
+        sizes = {}
+        for scene in self.scenes:
+            request = urllib.request.Request(f'{self.base_url}/media/{scene}.mp4', method='HEAD')
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    sizes[scene] = int(response.headers['Content-Length'])
+            except (urllib.error.URLError, OSError, TypeError, ValueError):
+                continue
+        if not sizes:
+            raise ValueError("No rendered videos to seek in")
+        return sizes
+
+    # ---------- cache control ----------
+
+    def _clear_videos(self):
+        for scene in self.scenes:
+            try:
+                os.remove(os.path.join(self.media_dir, f'{scene}.mp4'))
+            except FileNotFoundError:
+                pass  # Another worker thread cleared it first
+
+    def _warm_videos(self):
+        for id in self.animation_ids:
+            fetch(f'{self.base_url}/animation/{id}')
+
+    # ---------- running ----------
+
+    def _execute(self, plan, before_each=None):
+        def one(item):
+            if before_each:
+                before_each()
+            url, headers = item
+            return fetch(url, headers)
+
+        renders_before = self.counter.count if self.counter else None
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(one, plan))
+        elapsed = time.perf_counter() - start
+        renders = self.counter.count - renders_before if self.counter else None
+        return summarize(results, elapsed, renders)
+
+    def run(self, workload):
+        if workload in ('cold', 'same-scene') and self.media_dir is None:
+            raise ValueError(f"The {workload} workload needs --stub so it can clear cached videos")
+
+        if workload == 'warm':
+            self._warm_videos()
+            return self._execute(self._page_urls())
+        if workload == 'cold':
+            # Videos are deleted before every request, but concurrent views of a
+            # scene still share one render and '/' never renders, so expect
+            # fewer renders than requests
+            return self._execute(self._page_urls(), before_each=self._clear_videos)
+        if workload == 'same-scene':
+            self._clear_videos()
+            return self._execute(self._same_scene_urls())
+        if workload == 'range-seek':
+            self._warm_videos()
+            return self._execute(self._range_urls())
+        raise ValueError(f"Unknown workload {workload!r}; expected one of {', '.join(WORKLOADS)}")
+
+
+def summarize(results, elapsed, renders):
+    """Aggregate (status, latency, bytes) tuples into a report dict."""
+    latencies = sorted(latency for _, latency, _ in results)
+    statuses = {}
+    for status, _, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    errors = sum(count for status, count in statuses.items() if status is None or status >= 400)
+    return {
+        'requests': len(results),
+        'elapsed': elapsed,
+        'throughput': len(results) / elapsed if elapsed else 0.0,
+        'error_rate': errors / len(results) if results else 0.0,
+        'statuses': statuses,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+        'max': latencies[-1] if latencies else 0.0,
+        'bytes': sum(size for _, _, size in results),
+        'renders': renders,
+    }
+
+
+def print_report(workload, report):
+    statuses = ', '.join(f"{status or 'failed'}: {count}"
+                         for status, count in sorted(report['statuses'].items(), key=lambda item: str(item[0])))
+    print(f"--- {workload} ---")
+    print(f"  requests    {report['requests']} in {report['elapsed']:.2f}s "
+          f"({report['throughput']:.1f} req/s, {report['bytes'] / 1e6:.1f} MB)")
+    print(f"  latency     p50 {report['p50'] * 1000:.1f}ms  p90 {report['p90'] * 1000:.1f}ms  "
+          f"p99 {report['p99'] * 1000:.1f}ms  max {report['max'] * 1000:.1f}ms")
+    print(f"  errors      {report['error_rate']:.1%}  ({statuses})")
+    if report['renders'] is not None:
+        print(f"  renders     {report['renders']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate viewer traffic against the coffee shop app.")
+    parser.add_argument('--workload', choices=WORKLOADS + ('all',), default='all')
+    parser.add_argument('--concurrency', type=int, default=8, help="Simultaneous viewers")
+    parser.add_argument('--requests', type=int, default=100, help="Requests per workload")
+    parser.add_argument('--stub', action='store_true', help="Replace Manim with a fake renderer")
+    parser.add_argument('--render-delay', type=float, default=2.0,
+                        help="Seconds the stub renderer takes per scene (default: 2.0)")
+    parser.add_argument('--url', help="Test an already running server instead of an in-process one")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for repeatable runs")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    # Per-request access logs would drown out the report
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    workloads = WORKLOADS if args.workload == 'all' else (args.workload,)
+
+    if args.url:
+        test = LoadTest(args.url.rstrip('/'), args.concurrency, args.requests)
+        for workload in workloads:
+            if workload in ('cold', 'same-scene'):
+                print(f"--- {workload} --- skipped (needs --stub)")
+                continue
+            try:
+                print_report(workload, test.run(workload))
+            except ValueError as e:
+                print(f"--- {workload} --- skipped ({e})")
+        return
+
+    media_dir = None
+    if args.stub:
+        media_dir = tempfile.mkdtemp(prefix='coffee-load-')
+        coffee_app.MEDIA_DIR = media_dir
+        coffee_app.render_animation = stub_renderer(media_dir, args.render_delay)
+        # Stub render times must not overwrite the costs learned from real renders
+        coffee_app.scheduler = RenderScheduler(stats_path=os.path.join(media_dir, 'render_costs.json'))
+    counter = RenderCounter(coffee_app.render_animation)
+    coffee_app.render_animation = counter
+
+    try:
+        with LocalServer() as server:
+            print(f"Testing {server.url} ({'stub' if args.stub else 'Manim'} renderer, "
+                  f"{coffee_app.scheduler.max_concurrency} render slots)")
+            test = LoadTest(server.url, args.concurrency, args.requests, media_dir, counter)
+            for workload in workloads:
+                if workload in ('cold', 'same-scene') and not args.stub:
+                    print(f"--- {workload} --- skipped (needs --stub)")
+                    continue
+                try:
+                    print_report(workload, test.run(workload))
+                except ValueError as e:
+                    print(f"--- {workload} --- skipped ({e})")
+    finally:
+        if media_dir:
+            shutil.rmtree(media_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
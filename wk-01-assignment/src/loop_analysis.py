@@ -0,0 +1,267 @@
+"""
+Equilibrium and Sensitivity Analysis for the Coffee Shop Stock-Flow Model
+Solves for where the feedback loops settle instead of simulating long horizons:
+Newton steady-state solving (with a fixed-point fallback), Jacobian eigenvalues
+to classify which loop dominates, and batched finite-difference sensitivities.
+
+Model (time in hours), stocks = [Regulars, Order Queue, Inventory]:
+    arrivals   = visit_rate * Regulars
+    joining    = arrivals * patience / (patience + Queue)        # Wait Time Regulator (−)
+    served     = capacity * Queue / (Queue + 1) * Inventory / (Inventory + inventory_half)
+    Regulars'  = referral_rate * served * (1 − Regulars / market_size)   # Word of Mouth (+)
+                 − churn_rate * Regulars − balk_churn * (arrivals − joining)
+    Queue'     = joining − served
+    Inventory' = restock_rate * (target_inventory − Inventory) − units_per_drink * served
+Cash accumulates without settling, so its net flow is reported instead.
+"""
+import math
+
+import numpy as np
+
+STOCKS = ('regulars', 'queue', 'inventory')
+
+DEFAULT_PARAMS = {
+    'visit_rate': 0.05,         # visits per regular per hour
+    'market_size': 2000.0,      # potential regulars in the neighbourhood
+    'referral_rate': 0.1,       # new regulars per satisfied (served) customer
+    'churn_rate': 0.002,        # fraction of regulars lost per hour
+    'balk_churn': 0.05,         # regulars lost per customer who leaves the queue
+    'patience': 6.0,            # queue length at which half of arrivals walk away
+    'capacity': 40.0,           # drinks per hour the baristas can make
+    'inventory_half': 20.0,     # inventory at which service runs at half speed
+    'restock_rate': 0.5,        # fraction of the inventory gap restocked per hour
+    'target_inventory': 400.0,  # inventory the shop restocks towards
+    'units_per_drink': 1.0,     # inventory units used per drink
+    'price': 5.0,               # revenue per drink
+    'unit_cost': 1.5,           # cost per restocked inventory unit
+}
+
+PARAM_NAMES = tuple(DEFAULT_PARAMS)
+
+# Relative step used for finite differences
+FD_STEP = 1e-6
+
+
+def params_array(params):
+    """Parameter dict -> array of shape (..., n_params) in PARAM_NAMES order."""
+    merged = {**DEFAULT_PARAMS, **(params or {})}
+    unknown = set(merged) - set(PARAM_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    return np.stack(np.broadcast_arrays(*[np.asarray(merged[name], dtype=float) for name in PARAM_NAMES]), axis=-1)
+
+
+def flow_rates(x, p):
+    """Named flows for states x (..., 3) and parameters p (..., n_params)."""
+    regulars, queue, inventory = np.moveaxis(x, -1, 0)
+    (visit_rate, market_size, referral_rate, churn_rate, balk_churn, patience, capacity,
+     inventory_half, restock_rate, target_inventory, units_per_drink, price, unit_cost) = np.moveaxis(p, -1, 0)
+
+    arrivals = visit_rate * regulars
+    joining = arrivals * patience / (patience + queue)
+    served = capacity * queue / (queue + 1) * inventory / (inventory + inventory_half)
+    restocked = restock_rate * (target_inventory - inventory)
+    return {
+        'arrivals': arrivals,
+        'joining': joining,
+        'balking': arrivals - joining,
+        'served': served,
+        'restocked': restocked,
+        'referrals': referral_rate * served * (1 - regulars / market_size),
+        'churn': churn_rate * regulars + balk_churn * (arrivals - joining),
+        'cash_flow': price * served - unit_cost * restocked,
+    }
+
+
+def derivatives(x, p):
+    """Rates of change of the stocks; works on batches of states and parameters."""
+    f = flow_rates(x, p)
+    units_per_drink = p[..., PARAM_NAMES.index('units_per_drink')]
+    return np.stack([
+        f['referrals'] - f['churn'],
+        f['joining'] - f['served'],
+        f['restocked'] - units_per_drink * f['served'],
+    ], axis=-1)
+
+
+def jacobian(x, p):
+    """Central-difference Jacobian d(derivatives)/d(stocks), shape (..., 3, 3)."""
+    x = np.asarray(x, dtype=float)
+    n = x.shape[-1]
+    h = FD_STEP * np.maximum(np.abs(x), 1.0)
+    columns = []
+    for j in range(n):
+        step = np.zeros_like(x)
+        step[..., j] = h[..., j]
+        columns.append((derivatives(x + step, p) - derivatives(x - step, p)) / (2 * h[..., j, None]))
+    return np.stack(columns, axis=-1)
+
+
+def _default_guess(p):
+    market_size = p[..., PARAM_NAMES.index('market_size')]
+    target = p[..., PARAM_NAMES.index('target_inventory')]
+    return np.stack([0.5 * market_size, np.ones_like(market_size), target], axis=-1)
+
+
+def _fixed_point(x, p, steps=2000):
+    """Relax towards a stable steady state by damped forward stepping."""
+    for _ in range(steps):
+        rates = derivatives(x, p)
+        # Step size bounded by each stock's own time scale so the iteration stays stable
+        scale = np.abs(np.diagonal(jacobian(x, p), axis1=-2, axis2=-1))
+        dt = 0.5 / np.maximum(scale.max(axis=-1), 1e-3)
+        x = np.maximum(x + dt[..., None] * rates, 0.0)
+    return x
+
+
+def _newton(x, p, tol, max_iter):
+    """Batched damped Newton iteration; returns (states, converged mask)."""
+    for _ in range(max_iter):
+        rates = derivatives(x, p)
+        residual = np.linalg.norm(rates, axis=-1)
+        converged = residual < tol
+        if converged.all():
+            break
+        try:
+            delta = np.linalg.solve(jacobian(x, p), -rates[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            break
+        # Backtrack until the residual shrinks and the stocks stay non-negative
+        alpha = np.ones(residual.shape)
+        for _ in range(20):
+            trial = x + alpha[..., None] * delta
+            ok = (np.linalg.norm(derivatives(trial, p), axis=-1) < residual) & (trial >= 0).all(axis=-1)
+            if ok.all():
+                break
+            alpha = np.where(ok, alpha, alpha / 2)
+        x = np.where(converged[..., None], x, np.maximum(trial, 0.0))
+    return x, np.linalg.norm(derivatives(x, p), axis=-1) < tol
+
+
+def solve_equilibrium(params=None, guess=None, tol=1e-8, max_iter=50):
+    """
+    Steady state of the stocks for the given parameters (missing ones use DEFAULT_PARAMS).
+    Parameters may be arrays to solve many scenarios at once; returns states (..., 3).
+    """
+    p = params_array(params)
+    x = _default_guess(p) if guess is None else np.broadcast_to(np.asarray(guess, dtype=float), p.shape[:-1] + (3,))
+    x, converged = _newton(x.copy(), p, tol, max_iter)
+    unstable = converged & ~_stable(x, p)
+    if not converged.all() or unstable.any():
+        # Newton wandered off, or found a root the system runs away from (such as
+        # the empty shop): relax towards the attractor first, then polish. An
+        # unstable root is itself a fixed point, so those restart from the guess.
+        start = np.where(unstable[..., None], _default_guess(p), x)
+        relaxed = _fixed_point(start, p)
+        ok = converged & ~unstable
+        x, converged = _newton(np.where(ok[..., None], x, relaxed), p, tol, max_iter)
+    if not (converged & _stable(x, p)).all():
+        raise ValueError("No stable steady state found for the given parameters")
+    return x
+
+
+def _stable(x, p):
+    """True where no eigenvalue of the Jacobian at x has a positive real part."""
+    return np.linalg.eigvals(jacobian(x, p)).real.max(axis=-1) <= 0
+
+
+def classify(x, params=None):
+    """
+    Eigen-analysis of the linearised system at state x.
+    A positive real eigenvalue means the reinforcing loop dominates (runaway
+    growth or decline); otherwise the balancing loop pulls the system back.
+    """
+    eigenvalues = np.linalg.eigvals(jacobian(np.asarray(x, dtype=float), params_array(params)))
+    leading = eigenvalues[np.argmax(eigenvalues.real)]
+    dominant = 'reinforcing' if leading.real > 0 else 'balancing'
+    slowest = min(abs(value.real) for value in eigenvalues)
+    return {
+        'eigenvalues': eigenvalues,
+        'dominant_loop': dominant,
+        'oscillates': bool(np.any(np.abs(eigenvalues.imag) > 1e-9)),
+        # Time for the slowest mode to close 98% of the gap (4 time constants)
+        'settling_hours': 4 / slowest if dominant == 'balancing' and slowest > 0 else math.inf,
+        'growth_rate': max(leading.real, 0.0),
+    }
+
+
+def word_of_mouth_growth(params=None):
+    """
+    Compounding rate (per hour) of Word of Mouth when the shop is nearly empty,
+    i.e. the leading eigenvalue at the no-customer state. Returns (rate, doubling hours).
+    """
+    p = params_array(params)
+    empty = np.array([0.0, 0.0, p[PARAM_NAMES.index('target_inventory')]])
+    rate = classify(empty, params)['growth_rate']
+    return rate, (math.log(2) / rate if rate > 0 else math.inf)
+
+
+def sensitivities(params=None, names=PARAM_NAMES, rel_step=1e-4):
+    """
+    Elasticities d(log stock)/d(log parameter) of the steady state for every parameter.
+    All perturbed scenarios are solved together as one batch.
+    Returns {parameter: {stock: elasticity}}.
+    """
+    base = {**DEFAULT_PARAMS, **(params or {})}
+    x0 = solve_equilibrium(base)
+
+    # One row per (parameter, +/- step) pair
+    batch = {name: np.full(2 * len(names), base[name], dtype=float) for name in PARAM_NAMES}
+    for i, name in enumerate(names):
+        batch[name][2 * i] *= 1 + rel_step
+        batch[name][2 * i + 1] *= 1 - rel_step
+    x = solve_equilibrium(batch, guess=x0)
+
+    result = {}
+    for i, name in enumerate(names):
+        if base[name] == 0:
+            continue
+        dx = (x[2 * i] - x[2 * i + 1]) / (2 * rel_step)
+        result[name] = {stock: float(dx[k] / x0[k]) if x0[k] else 0.0 for k, stock in enumerate(STOCKS)}
+    return result
+
+
+def analyze(params=None):
+    """Equilibrium, flows, loop classification and Word of Mouth growth in one report."""
+    x = solve_equilibrium(params)
+    p = params_array(params)
+    flows = {name: float(value) for name, value in flow_rates(x, p).items()}
+    rate, doubling = word_of_mouth_growth(params)
+    return {
+        'equilibrium': {stock: float(value) for stock, value in zip(STOCKS, x)},
+        'flows': flows,
+        # Little's law: average wait = queue length / throughput
+        'wait_minutes': float(x[1] / flows['served'] * 60) if flows['served'] else math.inf,
+        'stability': classify(x, params),
+        'word_of_mouth_rate': rate,
+        'word_of_mouth_doubling_hours': doubling,
+    }
+
+
+def summary_notes(params=None):
+    """Summary panel lines for FeedbackLoopsScene, driven by the analysis."""
+    report = analyze(params)
+    doubling = report['word_of_mouth_doubling_hours']
+    reinforcing = ("Amplifies change",
+                   f"(doubles every {doubling / 24:.1f} days)" if math.isfinite(doubling)
+                   else "(exponential growth/decline)")
+    balancing = ("Resists change",
+                 f"(settles at {report['equilibrium']['queue']:.1f} in queue, "
+                 f"~{report['wait_minutes']:.0f} min wait)")
+    return reinforcing, balancing
+
+
+if __name__ == '__main__':
+    report = analyze()
+    print("Equilibrium:")
+    for stock, value in report['equilibrium'].items():
+        print(f"  {stock:<10} {value:10.2f}")
+    print(f"Wait time: {report['wait_minutes']:.1f} min, "
+          f"net cash flow: ${report['flows']['cash_flow']:.2f}/hr")
+    stability = report['stability']
+    print(f"Dominant loop: {stability['dominant_loop']} "
+          f"(eigenvalues {np.round(stability['eigenvalues'], 4)})")
+    print(f"Word of Mouth doubles every {report['word_of_mouth_doubling_hours']:.1f} hours from an empty shop")
+    print("Elasticities (regulars / queue / inventory):")
+    for name, values in sensitivities().items():
+        print(f"  {name:<17} " + "  ".join(f"{values[stock]:+.3f}" for stock in STOCKS))
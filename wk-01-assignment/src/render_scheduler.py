@@ -0,0 +1,273 @@
+"""
+Render Scheduler for Manim Animations
+Bounds how many Manim processes run at once, orders waiting renders by priority
+(interactive page views before batch pre-renders), learns per-scene render costs
+from past runs and refuses new work with a Retry-After hint when saturated.
+
+Queues are per process. Schedulers given the same slot_dir (web workers, the
+batch renderer and the scene watcher) also share one machine-wide pool of
+render slots held as file locks, so together they stay within the memory
+budget; batch renders leave the last free slot to page views.
+"""
+from concurrent.futures import Future
+import heapq
+import itertools
+import json
+import math
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # No file locks (Windows): the limit is per process only
+    fcntl = None
+
+# Priority classes (lower runs first)
+INTERACTIVE = 0
+BATCH = 1
+
+# Rough peak memory of one low-quality Manim render process
+MANIM_PROCESS_MB = 600
+
+# Fraction of physical RAM renders may use; the rest is left for the web app
+RENDER_MEMORY_FRACTION = 0.5
+
+# Cost (seconds) assumed for scenes that have never been rendered
+DEFAULT_COST = 30.0
+
+# Weight given to the newest render time in the running cost estimate
+COST_SMOOTHING = 0.3
+
+# Shared slot pool used by the app, batch_render.py and dev_watch.py
+SLOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'media', 'render_slots')
+
+# Seconds between attempts to take a slot held by another process
+SLOT_POLL = 0.25
+
+
+class SchedulerSaturated(Exception):
+    """Raised when the render queue is full; retry_after is a wait hint in seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Render queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def default_concurrency():
+    """Concurrent renders the machine can afford, limited by both cores and RAM."""
+    cpus = os.cpu_count() or 1
+    try:
+        total_mb = os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return cpus
+    by_memory = int(total_mb * RENDER_MEMORY_FRACTION // MANIM_PROCESS_MB)
+    return max(1, min(cpus, by_memory))
+
+
+class RenderScheduler:
+    """
+    Runs render jobs with bounded concurrency.
+    Concurrent requests for the same key share a single render.
+    With slot_dir, every render also holds one of `slots` lock files shared
+    with other processes using that directory.
+    """
+
+    def __init__(self, max_concurrency=None, max_queue=16, stats_path=None, slot_dir=None, slots=None):
+        self.max_concurrency = max_concurrency or default_concurrency()
+        self.max_queue = max_queue
+        self.stats_path = stats_path
+        self.slot_dir = slot_dir if fcntl is not None else None
+        self.slots = slots or default_concurrency()
+        self._slot_files = {}  # key -> open, locked slot file
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, seq, key)
+        self._queued = {}  # key -> its current entry in _waiting
+        self._seq = itertools.count()
+        self._running = {}  # key -> start time
+        self._inflight = {}  # key -> Future shared by all callers
+        self._cost_keys = {}  # key -> key its cost estimate is kept under
+        self._costs = self._load_costs()
+
+    # ---------- cost estimates ----------
+
+    def _load_costs(self):
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return {}
+        try:
+            with open(self.stats_path) as f:
+                return {key: float(value) for key, value in json.load(f).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_costs(self):
+        if not self.stats_path:
+            return
+        tmp_path = f"{self.stats_path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._costs, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.stats_path)
+        except OSError as e:
+            # The estimates are only a hint; a failed write must not fail the render
+            print(f"Could not save render costs to {self.stats_path}: {e}")
+
+    def estimate(self, key):
+        """Expected render time in seconds for key."""
+        return self._costs.get(key, DEFAULT_COST)
+
+    def record(self, key, seconds):
+        """Fold an observed render time into the estimate for key."""
+        with self._cond:
+            previous = self._costs.get(key)
+            if previous is None:
+                self._costs[key] = seconds
+            else:
+                self._costs[key] = (1 - COST_SMOOTHING) * previous + COST_SMOOTHING * seconds
+            self._save_costs()
+
+    # ---------- admission ----------
+
+    def retry_after(self):
+        """Seconds until the current backlog should have drained."""
+        with self._cond:
+            return self._retry_after_locked()
+
+    def _retry_after_locked(self):
+        now = time.monotonic()
+        pending = sum(self.estimate(self._cost_keys[key]) for _, _, key in self._waiting)
+        pending += sum(max(self.estimate(self._cost_keys[key]) - (now - start), 0)
+                       for key, start in self._running.items())
+        return max(1, math.ceil(pending / self.max_concurrency))
+
+    def _admit_locked(self, priority):
+        if len(self._running) < self.max_concurrency and not self._waiting:
+            return True
+        # Batch work may only fill half the queue so page views can still get in
+        limit = self.max_queue if priority == INTERACTIVE else self.max_queue // 2
+        return len(self._waiting) < limit
+
+    def stats(self):
+        """Snapshot of scheduler load."""
+        with self._cond:
+            return {
+                'running': len(self._running),
+                'waiting': len(self._waiting),
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+            }
+
+    # ---------- execution ----------
+
+    def run(self, key, fn, priority=INTERACTIVE, cost_key=None):
+        """
+        Run fn() once a render slot is free and return its result.
+        The render time is recorded under cost_key (default: key).
+        Raises SchedulerSaturated if the queue is full.
+        """
+        with self._cond:
+            shared = self._inflight.get(key)
+            if shared is None:
+                if not self._admit_locked(priority):
+                    raise SchedulerSaturated(self._retry_after_locked())
+                shared = Future()
+                self._inflight[key] = shared
+                self._cost_keys[key] = cost_key or key
+                self._enqueue_locked(key, priority)
+                owner = True
+            else:
+                owner = False
+                self._promote_locked(key, priority)
+
+        if not owner:
+            return shared.result()
+
+        try:
+            self._acquire(key)
+            start = time.monotonic()
+            try:
+                result = fn()
+            finally:
+                self._release(key)
+            self.record(self._cost_keys[key], time.monotonic() - start)
+        except BaseException as e:
+            shared.set_exception(e)
+            raise
+        else:
+            shared.set_result(result)
+            return result
+        finally:
+            with self._cond:
+                del self._inflight[key]
+                del self._cost_keys[key]
+
+    def _enqueue_locked(self, key, priority):
+        entry = (priority, next(self._seq), key)
+        self._queued[key] = entry
+        heapq.heappush(self._waiting, entry)
+
+    def _promote_locked(self, key, priority):
+        """Move a waiting render up to the priority of a caller that joined it."""
+        entry = self._queued.get(key)
+        if entry is None or entry[0] <= priority:
+            return  # Already running, or already at this priority or better
+        self._waiting.remove(entry)
+        heapq.heapify(self._waiting)
+        self._enqueue_locked(key, priority)
+        self._cond.notify_all()
+
+    def _acquire(self, key):
+        with self._cond:
+            while True:
+                entry = self._queued[key]
+                if self._waiting[0] is entry and len(self._running) < self.max_concurrency:
+                    slot_file = self._take_slot(entry[0])
+                    if slot_file is not False:
+                        break
+                    # No usable machine-wide slot; other processes cannot notify us, so poll
+                    self._cond.wait(SLOT_POLL)
+                else:
+                    self._cond.wait()
+            heapq.heappop(self._waiting)
+            del self._queued[key]
+            self._running[key] = time.monotonic()
+            if slot_file is not None:
+                self._slot_files[key] = slot_file
+            self._cond.notify_all()
+
+    def _release(self, key):
+        with self._cond:
+            del self._running[key]
+            slot_file = self._slot_files.pop(key, None)
+            if slot_file is not None:
+                slot_file.close()  # Closing drops the lock
+            self._cond.notify_all()
+
+    def _take_slot(self, priority):
+        """
+        Lock a free machine-wide slot file and return it; None without a slot
+        pool, False if no slot this priority may use is free.
+        """
+        if self.slot_dir is None:
+            return None
+        os.makedirs(self.slot_dir, exist_ok=True)
+        # Batch work only starts if another slot stays free for page views
+        needed = 1 if priority == INTERACTIVE or self.slots == 1 else 2
+        free = []
+        for n in range(self.slots):
+            slot_file = open(os.path.join(self.slot_dir, f'slot-{n}.lock'), 'a')
+            try:
+                fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                slot_file.close()
+                continue
+            free.append(slot_file)
+            if len(free) == needed:
+                break
+        for slot_file in free[1:]:
+            slot_file.close()
+        if len(free) < needed:
+            if free:
+                free[0].close()
+            return False
+        return free[0]
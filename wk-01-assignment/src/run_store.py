@@ -0,0 +1,166 @@
+"""
+Memory-Mapped Columnar Store for Simulation Runs
+Each dataset is a directory with one fixed-dtype file per stock, laid out as
+(runs × time steps) in row-major order, plus a small index.json. Runs are
+appended in chunks as they stream out of the simulator; readers memory-map the
+columns, so slicing by run, time window or stock is zero-copy and every web
+worker shares the same pages through the OS cache.
+
+Usage:
+    python run_store.py baseline --runs 5000 --hours 72
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+INDEX_FILE = 'index.json'
+FORMAT_VERSION = 1
+
+
+def _column_path(path, stock):
+    return os.path.join(path, f'{stock}.bin')
+
+
+class RunStoreWriter:
+    """Appends chunks of runs to a new dataset directory."""
+
+    def __init__(self, path, stocks, n_steps, dt, dtype='float32', metadata=None):
+        if os.path.exists(os.path.join(path, INDEX_FILE)):
+            raise ValueError(f"Run store already exists at {path}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.stocks = tuple(stocks)
+        self.n_steps = n_steps
+        self.dtype = np.dtype(dtype)
+        self.n_runs = 0
+        self.index = {
+            'version': FORMAT_VERSION,
+            'stocks': list(self.stocks),
+            'dtype': self.dtype.str,
+            'n_steps': n_steps,
+            'dt': dt,
+            'n_runs': 0,
+            'complete': False,
+            'metadata': metadata or {},
+        }
+        self._files = {stock: open(_column_path(path, stock), 'wb') for stock in self.stocks}
+        self._write_index()
+
+    def _write_index(self):
+        tmp_path = os.path.join(self.path, f'{INDEX_FILE}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, INDEX_FILE))
+
+    def append(self, chunk):
+        """Append runs shaped (runs, n_steps, n_stocks)."""
+        chunk = np.asarray(chunk)
+        if chunk.ndim != 3 or chunk.shape[1:] != (self.n_steps, len(self.stocks)):
+            raise ValueError(f"Expected chunk of shape (runs, {self.n_steps}, {len(self.stocks)}), got {chunk.shape}")
+        for k, stock in enumerate(self.stocks):
+            f = self._files[stock]
+            f.write(np.ascontiguousarray(chunk[:, :, k], dtype=self.dtype).tobytes())
+            f.flush()
+        # Publish the new run count only after the data is on disk
+        self.n_runs += chunk.shape[0]
+        self.index['n_runs'] = self.n_runs
+        self._write_index()
+
+    def close(self, complete=True):
+        """Close the column files; an incomplete store keeps the runs written so far."""
+        for f in self._files.values():
+            f.close()
+        self.index['complete'] = complete
+        self._write_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # An interrupted simulation must not be published as complete
+        self.close(complete=exc_type is None)
+
+
+class RunStore:
+    """Read-only, memory-mapped view of a dataset."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        if self.index.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported run store version {self.index.get('version')} at {path}")
+        self.stocks = tuple(self.index['stocks'])
+        self.dtype = np.dtype(self.index['dtype'])
+        self.n_runs = self.index['n_runs']
+        self.n_steps = self.index['n_steps']
+        self.dt = self.index['dt']
+        self._columns = {}
+
+    def column(self, stock):
+        """Whole (n_runs, n_steps) column for a stock, memory-mapped on first use."""
+        if stock not in self.stocks:
+            raise ValueError(f"Unknown stock {stock!r}; expected one of {', '.join(self.stocks)}")
+        if stock not in self._columns:
+            if self.n_runs == 0:
+                self._columns[stock] = np.empty((0, self.n_steps), dtype=self.dtype)
+            else:
+                self._columns[stock] = np.memmap(_column_path(self.path, stock), dtype=self.dtype, mode='r',
+                                                 shape=(self.n_runs, self.n_steps))
+        return self._columns[stock]
+
+    def steps(self, start=None, end=None):
+        """Slice of time steps covering [start, end) hours."""
+        first = 0 if start is None else max(0, int(np.floor(start / self.dt)))
+        last = self.n_steps if end is None else min(self.n_steps, int(np.ceil(end / self.dt)))
+        return slice(first, max(first, last))
+
+    def times(self, start=None, end=None):
+        window = self.steps(start, end)
+        return np.round(np.arange(window.start, window.stop) * self.dt, 6)
+
+    def select(self, stock, runs=slice(None), start=None, end=None):
+        """Zero-copy view of a stock for the given runs and time window (hours)."""
+        return self.column(stock)[runs, self.steps(start, end)]
+
+    def quantiles(self, stock, qs=(0.1, 0.5, 0.9), runs=slice(None), start=None, end=None):
+        """Quantiles across runs at every time step of the window, shape (len(qs), steps)."""
+        return np.quantile(self.select(stock, runs, start, end), qs, axis=0)
+
+
+def write_simulation(path, n_runs, hours=72.0, dt=0.05, params=None, chunk_runs=256, seed=None):
+    """Run the Monte Carlo simulation and stream it into a new store."""
+    from simulation import STOCKS, simulate_runs
+
+    n_steps = int(round(hours / dt))
+    metadata = {'params': params or {}, 'seed': seed, 'hours': hours}
+    with RunStoreWriter(path, STOCKS, n_steps, dt, metadata=metadata) as writer:
+        for chunk in simulate_runs(n_runs, hours, dt, params, chunk_runs, seed):
+            writer.append(chunk)
+            print(f"  {writer.n_runs}/{n_runs} runs written")
+    return RunStore(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate Monte Carlo runs into a run store.")
+    parser.add_argument('name', help="Dataset name (directory under media/runs)")
+    parser.add_argument('--runs', type=int, default=1000)
+    parser.add_argument('--hours', type=float, default=72.0)
+    parser.add_argument('--dt', type=float, default=0.05, help="Time step in hours")
+    parser.add_argument('--chunk', type=int, default=256, help="Runs simulated per chunk")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'media', 'runs', args.name)
+    start = time.perf_counter()
+    store = write_simulation(path, args.runs, args.hours, args.dt, chunk_runs=args.chunk, seed=args.seed)
+    size_mb = sum(os.path.getsize(_column_path(path, stock)) for stock in store.stocks) / 1e6
+    print(f"Wrote {store.n_runs} runs × {store.n_steps} steps to {path} "
+          f"({size_mb:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
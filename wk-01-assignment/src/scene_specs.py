@@ -0,0 +1,299 @@
+"""
+Declarative Scene Specs for the Coffee Shop System
+Describes stock bars, flows, feedback loops and pipeline steps as JSON/YAML data
+and compiles them into the existing Manim scene types from scenes.py.
+
+Example spec (JSON):
+
+    {
+        "type": "stocks-flows",
+        "title": "Downtown: Watch the Changes!",
+        "stocks": [
+            {"name": "Inventory", "value": 50, "color": "#4CAF50"},
+            {"name": "Orders", "value": 30, "color": "#FF9800"}
+        ],
+        "phases": [
+            {"label": "Morning Rush", "color": "#FFD54F", "changes": [-20, 40]}
+        ]
+    }
+"""
+import hashlib
+import json
+import os
+
+try:
+    import yaml
+except ImportError:  # YAML specs are optional; JSON always works
+    yaml = None
+
+
+# Spec type -> (base scene class in scenes.py, keys the spec may set)
+SPEC_TYPES = {
+    'stocks': ('StocksScene', {'title', 'stocks'}),
+    'flows': ('FlowsScene', {'title', 'flows'}),
+    'feedback-loops': ('FeedbackLoopsScene', {'title', 'loops', 'summary_notes'}),
+    'full-system': ('FullSystemScene', {'steps', 'summary'}),
+    'stocks-flows': ('StocksFlowsDynamicScene', {'title', 'stocks', 'flows', 'phases', 'final_label'}),
+}
+
+# Keys that describe the spec itself rather than scene content
+META_KEYS = {'type', 'name'}
+
+LOOP_LABELS = {
+    'reinforcing': '1. Reinforcing Loop (+)',
+    'balancing': '2. Balancing Loop (−)',
+}
+
+STEP_STAGES = ('arrive', 'queue', 'order', 'make', 'leave', 'repeat', 'complete')
+
+DEFAULT_COLOR = '#FFD54F'
+
+# Code a compiled spec renders with; editing any of it invalidates rendered variants
+SCENE_SOURCES = ('scenes.py', 'loop_analysis.py', 'scene_specs.py')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_spec(path):
+    """Load a scene spec from a .json, .yaml or .yml file."""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise ValueError(f"PyYAML is required to load {path}")
+            try:
+                return yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML in {path}: {e}") from e
+        return json.load(f)
+
+
+def scene_code_hash():
+    """Hash of the scene code specs compile into (SCENE_SOURCES)."""
+    digest = hashlib.sha256()
+    for name in SCENE_SOURCES:
+        with open(os.path.join(BASE_DIR, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def spec_hash(spec):
+    """
+    Stable short hash of a spec's scene content and the scene code it compiles
+    into; specs that only differ in metadata (e.g. their name) render to the
+    same video, and an edit to scenes.py gives every spec a new hash.
+    """
+    content = {key: value for key, value in spec.items() if key not in META_KEYS - {'type'}}
+    content = {'spec': content, 'code': scene_code_hash()}
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+# JSON type names for validation errors
+TYPE_NAMES = {dict: 'an object', list: 'a list', str: 'a string', (int, float): 'a number'}
+
+
+def _require(item, key, where, kind=None):
+    if not isinstance(item, dict):
+        raise ValueError(f"{where} must be an object, got {type(item).__name__}")
+    if key not in item:
+        raise ValueError(f"{where} is missing '{key}'")
+    value = item[key]
+    if kind is not None and (not isinstance(value, kind) or isinstance(value, bool)):
+        raise ValueError(f"{where} '{key}' must be {TYPE_NAMES[kind]}, got {value!r}")
+    return value
+
+
+def _optional(item, key, where, kind, default):
+    """Like _require, for keys that fall back to default when left out."""
+    return _require(item, key, where, kind) if key in item else default
+
+
+def _stocks(spec):
+    stocks = _require(spec, 'stocks', 'spec', list)
+    if not stocks:
+        raise ValueError("spec 'stocks' must not be empty")
+    result = []
+    for i, stock in enumerate(stocks):
+        value = _require(stock, 'value', f"stocks[{i}]", (int, float))
+        if not 0 <= value <= 100:
+            raise ValueError(f"stocks[{i}] value must be between 0 and 100, got {value}")
+        result.append({
+            'name': _require(stock, 'name', f"stocks[{i}]", str),
+            'value': value,
+            'color': _optional(stock, 'color', f"stocks[{i}]", str, DEFAULT_COLOR),
+        })
+    return result
+
+
+def _flows(spec):
+    result = []
+    for i, flow in enumerate(_require(spec, 'flows', 'spec', list)):
+        direction = _require(flow, 'direction', f"flows[{i}]", str)
+        if direction not in ('inflow', 'outflow'):
+            raise ValueError(f"flows[{i}] direction must be 'inflow' or 'outflow', got {direction!r}")
+        default_color = '#4CAF50' if direction == 'inflow' else '#F44336'
+        result.append((_require(flow, 'name', f"flows[{i}]", str), direction,
+                       _optional(flow, 'color', f"flows[{i}]", str, default_color)))
+    return result
+
+
+def _loops(spec):
+    loops = {}
+    for i, loop in enumerate(_require(spec, 'loops', 'spec', list)):
+        polarity = _require(loop, 'polarity', f"loops[{i}]", str)
+        if polarity not in LOOP_LABELS:
+            raise ValueError(f"loops[{i}] polarity must be 'reinforcing' or 'balancing', got {polarity!r}")
+        if polarity in loops:
+            raise ValueError(f"spec has more than one {polarity} loop")
+        components = _require(loop, 'components', f"loops[{i}]", list)
+        if len(components) < 2:
+            raise ValueError(f"loops[{i}] needs at least two components")
+        if not all(isinstance(component, str) for component in components):
+            raise ValueError(f"loops[{i}] components must all be strings, got {components!r}")
+        default_color = '#4CAF50' if polarity == 'reinforcing' else '#FF9800'
+        loops[polarity] = {
+            'label': _optional(loop, 'label', f"loops[{i}]", str, LOOP_LABELS[polarity]),
+            'name': _require(loop, 'name', f"loops[{i}]", str),
+            'color': _optional(loop, 'color', f"loops[{i}]", str, default_color),
+            'components': list(components),
+            'explanation': _optional(loop, 'explanation', f"loops[{i}]", str, ''),
+        }
+    missing = set(LOOP_LABELS) - set(loops)
+    if missing:
+        raise ValueError(f"spec is missing a {', '.join(sorted(missing))} loop")
+    return loops
+
+
+def _summary_notes(spec):
+    notes = _require(spec, 'summary_notes', 'spec', dict)
+    result = []
+    for polarity in LOOP_LABELS:
+        lines = _require(notes, polarity, 'summary_notes', list)
+        if len(lines) != 2 or not all(isinstance(line, str) for line in lines):
+            raise ValueError(f"summary_notes '{polarity}' must be two strings, got {lines!r}")
+        result.append(tuple(lines))
+    return tuple(result)
+
+
+def _steps(spec):
+    steps = {}
+    for i, step in enumerate(_require(spec, 'steps', 'spec', list)):
+        stage = _require(step, 'stage', f"steps[{i}]", str)
+        if stage not in STEP_STAGES:
+            raise ValueError(f"steps[{i}] stage must be one of {', '.join(STEP_STAGES)}, got {stage!r}")
+        steps[stage] = (_require(step, 'text', f"steps[{i}]", str),
+                        _optional(step, 'color', f"steps[{i}]", str, DEFAULT_COLOR))
+    return steps
+
+
+def _phases(spec, n_stocks):
+    result = []
+    for i, phase in enumerate(_require(spec, 'phases', 'spec', list)):
+        changes = _require(phase, 'changes', f"phases[{i}]", list)
+        if len(changes) != n_stocks:
+            raise ValueError(f"phases[{i}] has {len(changes)} changes for {n_stocks} stocks")
+        if not all(isinstance(change, (int, float)) and not isinstance(change, bool) for change in changes):
+            raise ValueError(f"phases[{i}] changes must all be numbers, got {changes!r}")
+        result.append({
+            'label': _require(phase, 'label', f"phases[{i}]", str),
+            'color': _optional(phase, 'color', f"phases[{i}]", str, DEFAULT_COLOR),
+            'changes': list(changes),
+        })
+    return result
+
+
+def scene_attributes(spec):
+    """
+    Validate a spec and translate it into class attributes for its base scene.
+    Returns (base scene class name, attribute dict). Does not import Manim.
+    """
+    spec_type = _require(spec, 'type', 'spec', str)
+    if spec_type not in SPEC_TYPES:
+        raise ValueError(f"Unknown spec type {spec_type!r}; expected one of {', '.join(SPEC_TYPES)}")
+    base_name, allowed = SPEC_TYPES[spec_type]
+    unknown = set(spec) - allowed - META_KEYS
+    if unknown:
+        raise ValueError(f"Keys not supported by '{spec_type}' specs: {', '.join(sorted(unknown))}")
+
+    attrs = {}
+    if 'title' in spec:
+        attrs['TITLE'] = _require(spec, 'title', 'spec', str)
+
+    if spec_type == 'stocks':
+        if 'stocks' in spec:
+            attrs['STOCKS'] = [(s['name'], s['value'] / 100, s['color']) for s in _stocks(spec)]
+
+    elif spec_type == 'flows':
+        if 'flows' in spec:
+            attrs['FLOWS'] = _flows(spec)
+
+    elif spec_type == 'feedback-loops':
+        if 'loops' in spec:
+            loops = _loops(spec)
+            attrs['REINFORCING_LOOP'] = loops['reinforcing']
+            attrs['BALANCING_LOOP'] = loops['balancing']
+        if 'summary_notes' in spec:
+            attrs['SUMMARY_NOTES'] = _summary_notes(spec)
+
+    elif spec_type == 'full-system':
+        if 'steps' in spec:
+            # Stages the spec leaves out keep the scene's default labels
+            attrs['STEP_OVERRIDES'] = _steps(spec)
+        if 'summary' in spec:
+            attrs['SUMMARY'] = _require(spec, 'summary', 'spec', str)
+
+    elif spec_type == 'stocks-flows':
+        if 'phases' in spec and 'stocks' not in spec:
+            raise ValueError("'stocks-flows' specs with phases must also list their stocks")
+        if 'stocks' in spec:
+            stocks = _stocks(spec)
+            attrs['STOCKS'] = stocks
+            if 'phases' in spec:
+                attrs['PHASES'] = _phases(spec, len(stocks))
+            else:
+                # Default phases are written for the default four stocks
+                attrs['PHASES'] = []
+        if 'flows' in spec:
+            flows = _flows(spec)
+            inflows = ', '.join(name for name, direction, _ in flows if direction == 'inflow')
+            outflows = ', '.join(name for name, direction, _ in flows if direction == 'outflow')
+            attrs['FLOW_LABELS'] = (f"↑ Inflows: {inflows}", f"↓ Outflows: {outflows}")
+        if 'final_label' in spec:
+            attrs['FINAL_LABEL'] = _require(spec, 'final_label', 'spec', str)
+
+    return base_name, attrs
+
+
+def compile_spec(spec, class_name='SpecScene'):
+    """Compile a spec into a Scene subclass of the matching scene in scenes.py."""
+    import scenes  # Imported lazily so specs can be validated without Manim installed
+
+    base_name, attrs = scene_attributes(spec)
+    base = getattr(scenes, base_name)
+
+    if 'STEP_OVERRIDES' in attrs:
+        attrs['STEPS'] = {**base.STEPS, **attrs.pop('STEP_OVERRIDES')}
+    if 'REINFORCING_LOOP' in attrs and 'SUMMARY_NOTES' not in attrs:
+        # The solved model describes the default loops, not the spec's own
+        attrs['SUMMARY_NOTES'] = base.STATIC_SUMMARY_NOTES
+
+    attrs['__doc__'] = f"{base.__doc__.strip()}\n\nCompiled from spec {spec_hash(spec)}."
+    return type(class_name, (base,), attrs)
+
+
+def compile_spec_file(path, class_name='SpecScene'):
+    """Load and compile a spec file in one step."""
+    return compile_spec(load_spec(path), class_name)
+
+
+def spec_files(paths):
+    """Expand a mix of spec files and directories into a sorted list of spec paths."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(('.json', '.yaml', '.yml')):
+                    found.append(os.path.join(path, name))
+        else:
+            found.append(path)
+    return found
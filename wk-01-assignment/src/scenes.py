@@ -4,23 +4,29 @@ Demonstrates stocks, flows, and feedback loops using mathematical animations.
 """
 from manim import *
 
+import loop_analysis
+
 
 class StocksScene(Scene):
     """Visualizes the four main stocks in a coffee shop system."""
     
+    TITLE = "Coffee Shop Stocks"
+    
+    # Stock data: (name, fill level 0-1, color)
+    STOCKS = [
+        ("Inventory\nLevels", 0.7, "#4CAF50"),
+        ("Order\nQueue", 0.4, "#FF9800"),
+        ("Cash\nReserves", 0.85, "#2196F3"),
+        ("Customer\nDensity", 0.55, "#9C27B0")
+    ]
+    
     def construct(self):
         # Title
-        title = Text("Coffee Shop Stocks", font_size=48, color=WHITE)
+        title = Text(self.TITLE, font_size=48, color=WHITE)
         title.to_edge(UP)
         self.play(Write(title))
         
-        # Stock data
-        stocks = [
-            ("Inventory\nLevels", 0.7, "#4CAF50"),
-            ("Order\nQueue", 0.4, "#FF9800"),
-            ("Cash\nReserves", 0.85, "#2196F3"),
-            ("Customer\nDensity", 0.55, "#9C27B0")
-        ]
+        stocks = self.STOCKS
         
         # Create stock visualizations
         stock_group = VGroup()
@@ -72,9 +78,19 @@ class StocksScene(Scene):
 class FlowsScene(Scene):
     """Visualizes the flows (inflows and outflows) in the coffee shop system."""
     
+    TITLE = "Coffee Shop Flows"
+    
+    # Specific flows: (name, "inflow" | "outflow", color)
+    FLOWS = [
+        ("Procurement", "inflow", "#4CAF50"),
+        ("Order Placement", "inflow", "#4CAF50"),
+        ("Sales/Consumption", "outflow", "#F44336"),
+        ("Order Fulfillment", "outflow", "#F44336")
+    ]
+    
     def construct(self):
         # Title
-        title = Text("Coffee Shop Flows", font_size=48, color=WHITE)
+        title = Text(self.TITLE, font_size=48, color=WHITE)
         title.to_edge(UP)
         self.play(Write(title))
         
@@ -101,12 +117,7 @@ class FlowsScene(Scene):
         self.wait()
         
         # Show specific flows
-        flows_data = [
-            ("Procurement", "inflow", "#4CAF50"),
-            ("Order Placement", "inflow", "#4CAF50"),
-            ("Sales/Consumption", "outflow", "#F44336"),
-            ("Order Fulfillment", "outflow", "#F44336")
-        ]
+        flows_data = self.FLOWS
         
         flow_texts = VGroup()
         for i, (name, flow_type, color) in enumerate(flows_data):
@@ -144,26 +155,71 @@ class FeedbackLoopsScene(Scene):
     Shows Word of Mouth loop first, then transitions to Wait Time Regulator loop.
     """
     
+    TITLE = "Feedback Loops"
+    
+    # Loop data: header text, loop components (in causal order), color and explanation
+    REINFORCING_LOOP = {
+        "label": "1. Reinforcing Loop (+)",
+        "name": "Word of Mouth",
+        "color": "#4CAF50",
+        "components": [
+            "High Quality",
+            "Customer\nSatisfaction",
+            "Positive\nReviews",
+            "New\nCustomers",
+            "Higher\nRevenue"
+        ],
+        "explanation": "Growth compounds! Quality → Customers → Revenue → Better Quality",
+    }
+    BALANCING_LOOP = {
+        "label": "2. Balancing Loop (−)",
+        "name": "Wait Time Regulator",
+        "color": "#FF9800",
+        "components": [
+            "High\nOrder Queue",
+            "Long\nWait Times",
+            "Customers\nLeave",
+            "Queue\nShrinks"
+        ],
+        "explanation": "System self-corrects! Long waits → Fewer customers → Queue shrinks",
+    }
+    
+    # Summary panel lines: (reinforcing, balancing). None solves the stock-flow
+    # model at render time for the Word of Mouth doubling time and the Wait Time
+    # Regulator's settling point, falling back to STATIC_SUMMARY_NOTES
+    SUMMARY_NOTES = None
+    STATIC_SUMMARY_NOTES = (
+        ("Amplifies change", "(exponential growth/decline)"),
+        ("Resists change", "(seeks equilibrium)"),
+    )
+    
+    def summary_notes(self):
+        if self.SUMMARY_NOTES is not None:
+            return self.SUMMARY_NOTES
+        try:
+            return loop_analysis.summary_notes()
+        except ValueError:
+            return self.STATIC_SUMMARY_NOTES
+    
     def construct(self):
+        pos_loop = self.REINFORCING_LOOP
+        neg_loop = self.BALANCING_LOOP
+        pos_color = pos_loop["color"]
+        neg_color = neg_loop["color"]
+        
         # ========== POSITIVE LOOP (Word of Mouth) ==========
-        title = Text("Feedback Loops", font_size=42, color=WHITE)
+        title = Text(self.TITLE, font_size=42, color=WHITE)
         title.to_edge(UP, buff=0.3)
         
-        loop_type = Text("1. Reinforcing Loop (+)", font_size=28, color="#4CAF50")
-        loop_name = Text("\"Word of Mouth\"", font_size=22, color=GRAY)
+        loop_type = Text(pos_loop["label"], font_size=28, color=pos_color)
+        loop_name = Text(f"\"{pos_loop['name']}\"", font_size=22, color=GRAY)
         header = VGroup(loop_type, loop_name).arrange(DOWN, buff=0.1)
         header.next_to(title, DOWN, buff=0.3)
         
         self.play(Write(title), FadeIn(header, shift=UP))
         
         # Positive loop components
-        pos_components = [
-            "High Quality",
-            "Customer\nSatisfaction",
-            "Positive\nReviews",
-            "New\nCustomers",
-            "Higher\nRevenue"
-        ]
+        pos_components = pos_loop["components"]
         
         # Create circular arrangement
         n = len(pos_components)
@@ -177,7 +233,7 @@ class FeedbackLoopsScene(Scene):
             
             box = RoundedRectangle(width=1.8, height=1, corner_radius=0.15,
                                    fill_color="#1a1a2e", fill_opacity=0.9,
-                                   stroke_color="#4CAF50", stroke_width=2)
+                                   stroke_color=pos_color, stroke_width=2)
             label = Text(comp, font_size=12, color=WHITE)
             group = VGroup(box, label)
             group.move_to(pos)
@@ -196,7 +252,7 @@ class FeedbackLoopsScene(Scene):
             arrow = Arrow(
                 start + direction * 0.75,
                 end - direction * 0.75,
-                color="#4CAF50",
+                color=pos_color,
                 stroke_width=2.5,
                 buff=0,
                 max_tip_length_to_length_ratio=0.2
@@ -206,16 +262,15 @@ class FeedbackLoopsScene(Scene):
         self.play(LaggedStart(*[GrowArrow(a) for a in pos_arrows], lag_ratio=0.1))
         
         # Add reinforcing symbol
-        plus = Text("+", font_size=40, color="#4CAF50", weight=BOLD)
-        circle = Circle(radius=0.35, color="#4CAF50", stroke_width=2)
+        plus = Text("+", font_size=40, color=pos_color, weight=BOLD)
+        circle = Circle(radius=0.35, color=pos_color, stroke_width=2)
         pos_symbol = VGroup(circle, plus)
         pos_symbol.move_to(DOWN * 0.5)
         
         self.play(Create(pos_symbol))
         
         # Explanation
-        pos_explain = Text("Growth compounds! Quality → Customers → Revenue → Better Quality", 
-                          font_size=14, color=GRAY)
+        pos_explain = Text(pos_loop["explanation"], font_size=14, color=GRAY)
         pos_explain.to_edge(DOWN, buff=0.4)
         self.play(Write(pos_explain))
         
@@ -226,8 +281,8 @@ class FeedbackLoopsScene(Scene):
         pos_elements = VGroup(pos_boxes, pos_arrows, pos_symbol, pos_explain, header)
         
         new_header = VGroup(
-            Text("2. Balancing Loop (−)", font_size=28, color="#FF9800"),
-            Text("\"Wait Time Regulator\"", font_size=22, color=GRAY)
+            Text(neg_loop["label"], font_size=28, color=neg_color),
+            Text(f"\"{neg_loop['name']}\"", font_size=22, color=GRAY)
         ).arrange(DOWN, buff=0.1)
         new_header.next_to(title, DOWN, buff=0.3)
         
@@ -238,12 +293,7 @@ class FeedbackLoopsScene(Scene):
         )
         
         # ========== NEGATIVE LOOP (Wait Time Regulator) ==========
-        neg_components = [
-            "High\nOrder Queue",
-            "Long\nWait Times",
-            "Customers\nLeave",
-            "Queue\nShrinks"
-        ]
+        neg_components = neg_loop["components"]
         
         n2 = len(neg_components)
         neg_boxes = VGroup()
@@ -255,7 +305,7 @@ class FeedbackLoopsScene(Scene):
             
             box = RoundedRectangle(width=1.8, height=1, corner_radius=0.15,
                                    fill_color="#1a1a2e", fill_opacity=0.9,
-                                   stroke_color="#FF9800", stroke_width=2)
+                                   stroke_color=neg_color, stroke_width=2)
             label = Text(comp, font_size=12, color=WHITE)
             group = VGroup(box, label)
             group.move_to(pos)
@@ -274,7 +324,7 @@ class FeedbackLoopsScene(Scene):
             arrow = Arrow(
                 start + direction * 0.8,
                 end - direction * 0.8,
-                color="#FF9800",
+                color=neg_color,
                 stroke_width=2.5,
                 buff=0,
                 max_tip_length_to_length_ratio=0.2
@@ -284,16 +334,15 @@ class FeedbackLoopsScene(Scene):
         self.play(LaggedStart(*[GrowArrow(a) for a in neg_arrows], lag_ratio=0.1))
         
         # Balancing symbol
-        minus = Text("−", font_size=40, color="#FF9800", weight=BOLD)
-        neg_circle = Circle(radius=0.35, color="#FF9800", stroke_width=2)
+        minus = Text("−", font_size=40, color=neg_color, weight=BOLD)
+        neg_circle = Circle(radius=0.35, color=neg_color, stroke_width=2)
         neg_symbol = VGroup(neg_circle, minus)
         neg_symbol.move_to(DOWN * 0.5)
         
         self.play(Create(neg_symbol))
         
         # Equilibrium indicator
-        eq_text = Text("System self-corrects! Long waits → Fewer customers → Queue shrinks", 
-                      font_size=14, color=GRAY)
+        eq_text = Text(neg_loop["explanation"], font_size=14, color=GRAY)
         eq_text.to_edge(DOWN, buff=0.4)
         self.play(Write(eq_text))
         
@@ -308,20 +357,22 @@ class FeedbackLoopsScene(Scene):
         summary_title = Text("Two Types of Feedback", font_size=28, color=WHITE)
         summary_title.next_to(title, DOWN, buff=0.4)
         
+        pos_notes, neg_notes = self.summary_notes()
+        
         # Left: Positive
         pos_summary = VGroup(
-            Text("+", font_size=48, color="#4CAF50", weight=BOLD),
-            Text("Reinforcing", font_size=20, color="#4CAF50"),
-            Text("Amplifies change", font_size=14, color=GRAY),
-            Text("(exponential growth/decline)", font_size=12, color=GRAY)
+            Text("+", font_size=48, color=pos_color, weight=BOLD),
+            Text("Reinforcing", font_size=20, color=pos_color),
+            Text(pos_notes[0], font_size=14, color=GRAY),
+            Text(pos_notes[1], font_size=12, color=GRAY)
         ).arrange(DOWN, buff=0.15)
         
         # Right: Negative
         neg_summary = VGroup(
-            Text("−", font_size=48, color="#FF9800", weight=BOLD),
-            Text("Balancing", font_size=20, color="#FF9800"),
-            Text("Resists change", font_size=14, color=GRAY),
-            Text("(seeks equilibrium)", font_size=12, color=GRAY)
+            Text("−", font_size=48, color=neg_color, weight=BOLD),
+            Text("Balancing", font_size=20, color=neg_color),
+            Text(neg_notes[0], font_size=14, color=GRAY),
+            Text(neg_notes[1], font_size=12, color=GRAY)
         ).arrange(DOWN, buff=0.15)
         
         summaries = VGroup(pos_summary, neg_summary).arrange(RIGHT, buff=2)
@@ -339,6 +390,19 @@ class FullSystemScene(Scene):
     Simplified layout with clear customer flow visualization.
     """
     
+    # Pipeline step labels shown in the step indicator: stage -> (text, color)
+    STEPS = {
+        "arrive": ("Step 1: Customer Arrives", "#4CAF50"),
+        "queue": ("Step 2: Joins Queue", "#FF9800"),
+        "order": ("Step 3: Places Order  (+$)", "#2196F3"),
+        "make": ("Step 4: Drink Made  (−Inventory)", "#9C27B0"),
+        "leave": ("Step 5: Customer Leaves!", "#F44336"),
+        "repeat": ("The Cycle Repeats!", "#FFD54F"),
+        "complete": ("Coffee Shop System Complete!", "#4CAF50"),
+    }
+    
+    SUMMARY = "System Flow: Enter → Queue → Order → Make → Exit"
+    
     def construct(self):
         # ========== STEP INDICATOR (large, prominent at top) ==========
         step_bg = Rectangle(width=10, height=0.8, color="#333", 
@@ -441,7 +505,7 @@ class FullSystemScene(Scene):
             current_step = new_step
         
         # --- STEP 1: Customer Arrives ---
-        update_step("Step 1: Customer Arrives", "#4CAF50")
+        update_step(*self.STEPS["arrive"])
         
         customer = create_customer()
         customer.move_to(entrance.get_left() + LEFT * 1)
@@ -452,14 +516,14 @@ class FullSystemScene(Scene):
         self.wait(0.5)
         
         # --- STEP 2: Joins Queue ---
-        update_step("Step 2: Joins Queue", "#FF9800")
+        update_step(*self.STEPS["queue"])
         
         self.play(customer.animate.move_to(queue.get_center()), run_time=1.5)
         self.play(Indicate(queue, color="#FF9800", scale_factor=1.03), run_time=0.5)
         self.wait(0.5)
         
         # --- STEP 3: Places Order (Cash +) ---
-        update_step("Step 3: Places Order  (+$)", "#2196F3")
+        update_step(*self.STEPS["order"])
         
         self.play(customer.animate.move_to(pos.get_center() + UP * 0.3), run_time=1.5)
         self.play(
@@ -470,7 +534,7 @@ class FullSystemScene(Scene):
         self.wait(0.5)
         
         # --- STEP 4: Drink Made (Inventory −) ---
-        update_step("Step 4: Drink Made  (−Inventory)", "#9C27B0")
+        update_step(*self.STEPS["make"])
         
         self.play(customer.animate.move_to(barista.get_center() + LEFT * 0.5), run_time=1.5)
         self.play(
@@ -487,7 +551,7 @@ class FullSystemScene(Scene):
         self.wait(0.3)
         
         # --- STEP 5: Customer Leaves ---
-        update_step("Step 5: Customer Leaves!", "#F44336")
+        update_step(*self.STEPS["leave"])
         
         self.play(customer.animate.move_to(exit_zone.get_center()), run_time=1.5)
         self.play(Indicate(exit_zone, color="#F44336", scale_factor=1.05), run_time=0.5)
@@ -499,7 +563,7 @@ class FullSystemScene(Scene):
         )
         
         # --- STEP 6: Cycle Repeats ---
-        update_step("The Cycle Repeats!", "#FFD54F")
+        update_step(*self.STEPS["repeat"])
         
         # Quick demo of another customer
         customer2 = create_customer()
@@ -516,13 +580,10 @@ class FullSystemScene(Scene):
         # ========== FINAL SUMMARY ==========
         self.wait(0.5)
         
-        summary = Text(
-            "System Flow: Enter → Queue → Order → Make → Exit",
-            font_size=18, color=WHITE
-        )
+        summary = Text(self.SUMMARY, font_size=18, color=WHITE)
         summary.to_edge(DOWN, buff=0.3)
         
-        update_step("Coffee Shop System Complete!", "#4CAF50")
+        update_step(*self.STEPS["complete"])
         self.play(Write(summary), run_time=1.0)
         
         self.wait(3)
@@ -534,6 +595,36 @@ class StocksFlowsDynamicScene(Scene):
     Simplified for clarity.
     """
     
+    TITLE = "Stocks & Flows: Watch the Changes!"
+    
+    # Stock bars: starting value is a percentage (0-100)
+    STOCKS = [
+        {"name": "Inventory", "color": "#4CAF50", "value": 50},
+        {"name": "Orders", "color": "#FF9800", "value": 30},
+        {"name": "Cash", "color": "#2196F3", "value": 40},
+        {"name": "Customers", "color": "#9C27B0", "value": 60},
+    ]
+    
+    FLOW_LABELS = (
+        "↑ Inflows: Arrivals, Purchases, Orders",
+        "↓ Outflows: Departures, Consumption, Fulfillment",
+    )
+    
+    # Phases of the day: one delta per stock (in STOCKS order)
+    PHASES = [
+        # Customers +30, Orders +40, Inventory -20, Cash +20
+        {"label": "Phase 1: Morning Rush - Customers Flood In!", "color": "#FFD54F",
+         "changes": [-20, +40, +20, +30]},
+        # Inventory +40, Orders -20, Cash -15
+        {"label": "Phase 2: Restocking - Supplies Arrive!", "color": "#4CAF50",
+         "changes": [+40, -20, -15, -10]},
+        # Everything stabilizes
+        {"label": "Phase 3: Afternoon - System Balances", "color": "#FF9800",
+         "changes": [-10, -15, +10, -20]},
+    ]
+    
+    FINAL_LABEL = "System Stabilized!"
+    
     def construct(self):
         # ========== PHASE INDICATOR (prominent at top) ==========
         phase_bg = Rectangle(width=10, height=0.7, color="#333", 
@@ -541,7 +632,7 @@ class StocksFlowsDynamicScene(Scene):
         phase_bg.to_edge(UP, buff=0.1)
         self.add(phase_bg)
         
-        phase_text = Text("Stocks & Flows: Watch the Changes!", font_size=24, color="#FFD54F", weight=BOLD)
+        phase_text = Text(self.TITLE, font_size=24, color="#FFD54F", weight=BOLD)
         phase_text.move_to(phase_bg)
         self.play(Write(phase_text), run_time=1)
         
@@ -556,12 +647,7 @@ class StocksFlowsDynamicScene(Scene):
             current_phase = new_phase
         
         # ========== STOCK BARS (simple, clean layout) ==========
-        stocks = [
-            {"name": "Inventory", "color": "#4CAF50", "value": 50},
-            {"name": "Orders", "color": "#FF9800", "value": 30},
-            {"name": "Cash", "color": "#2196F3", "value": 40},
-            {"name": "Customers", "color": "#9C27B0", "value": 60},
-        ]
+        stocks = self.STOCKS
         
         bar_height = 2.8
         bar_width = 1.2
@@ -604,9 +690,10 @@ class StocksFlowsDynamicScene(Scene):
         self.wait(1)
         
         # ========== FLOW LABELS ==========
+        inflow_text, outflow_text = self.FLOW_LABELS
         flow_info = VGroup(
-            Text("↑ Inflows: Arrivals, Purchases, Orders", font_size=14, color="#4CAF50"),
-            Text("↓ Outflows: Departures, Consumption, Fulfillment", font_size=14, color="#F44336"),
+            Text(inflow_text, font_size=14, color="#4CAF50"),
+            Text(outflow_text, font_size=14, color="#F44336"),
         ).arrange(DOWN, buff=0.1)
         flow_info.to_edge(DOWN, buff=0.2)
         self.play(FadeIn(flow_info), run_time=0.8)
@@ -642,47 +729,16 @@ class StocksFlowsDynamicScene(Scene):
             
             self.play(*animations, run_time=duration)
         
-        # ========== PHASE 1: MORNING RUSH ==========
-        update_phase("Phase 1: Morning Rush - Customers Flood In!", "#FFD54F")
-        self.wait(0.5)
-        
-        # Customers +30, Orders +40, Inventory -20, Cash +20
-        change_stocks([
-            (-20, None),  # Inventory down
-            (+40, None),  # Orders up
-            (+20, None),  # Cash up
-            (+30, None),  # Customers up
-        ])
-        self.wait(0.8)
-        
-        # ========== PHASE 2: RESTOCKING ==========
-        update_phase("Phase 2: Restocking - Supplies Arrive!", "#4CAF50")
-        self.wait(0.5)
-        
-        # Inventory +40, Orders -20, Cash -15
-        change_stocks([
-            (+40, None),  # Inventory up (restocking)
-            (-20, None),  # Orders down (fulfilled)
-            (-15, None),  # Cash down (paid supplier)
-            (-10, None),  # Customers down slightly
-        ])
-        self.wait(0.8)
-        
-        # ========== PHASE 3: AFTERNOON EQUILIBRIUM ==========
-        update_phase("Phase 3: Afternoon - System Balances", "#FF9800")
-        self.wait(0.5)
-        
-        # Everything stabilizes
-        change_stocks([
-            (-10, None),  # Inventory slight down
-            (-15, None),  # Orders clearing
-            (+10, None),  # Cash up
-            (-20, None),  # Customers leaving
-        ])
-        self.wait(0.8)
+        # ========== PHASES (Morning Rush → Restocking → Afternoon) ==========
+        for phase in self.PHASES:
+            update_phase(phase["label"], phase["color"])
+            self.wait(0.5)
+            
+            change_stocks([(delta, None) for delta in phase["changes"]])
+            self.wait(0.8)
         
         # ========== FINAL STATE ==========
-        update_phase("System Stabilized!", "#4CAF50")
+        update_phase(self.FINAL_LABEL, "#4CAF50")
         
         # Summary
         self.play(FadeOut(flow_info), run_time=0.5)
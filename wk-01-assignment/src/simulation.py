@@ -0,0 +1,50 @@
+"""
+Monte Carlo Simulation of the Coffee Shop Stock-Flow Model
+Steps many runs of the loop_analysis model forward in time at once, with
+per-run parameter uncertainty and hourly demand noise, and yields the results
+in chunks of runs so they can be streamed to disk.
+"""
+import numpy as np
+
+from loop_analysis import DEFAULT_PARAMS, PARAM_NAMES, derivatives, flow_rates, params_array, solve_equilibrium
+
+# Recorded stocks; cash is integrated from the model's net cash flow
+STOCKS = ('regulars', 'queue', 'inventory', 'cash')
+
+# Relative spread of each run's parameters around their base values
+PARAM_SPREAD = 0.1
+
+# Relative spread of demand (visit rate) from one hour to the next
+DEMAND_NOISE = 0.25
+
+
+def simulate_runs(n_runs, hours=72.0, dt=0.05, params=None, chunk_runs=256, seed=None,
+                  param_spread=PARAM_SPREAD, demand_noise=DEMAND_NOISE):
+    """
+    Yield arrays of shape (runs_in_chunk, n_steps, len(STOCKS)), float32.
+    Every run starts from the base steady state with a starting cash of zero.
+    """
+    rng = np.random.default_rng(seed)
+    base = {**DEFAULT_PARAMS, **(params or {})}
+    start = solve_equilibrium(base)
+    n_steps = int(round(hours / dt))
+    steps_per_hour = max(1, int(round(1 / dt)))
+    visit_index = PARAM_NAMES.index('visit_rate')
+
+    for first in range(0, n_runs, chunk_runs):
+        batch = min(chunk_runs, n_runs - first)
+        jitter = rng.lognormal(0.0, param_spread, size=(batch, len(PARAM_NAMES)))
+        p = params_array(base)[None, :] * jitter
+        base_visits = p[:, visit_index].copy()
+
+        x = np.repeat(start[None, :], batch, axis=0)
+        cash = np.zeros(batch)
+        out = np.empty((batch, n_steps, len(STOCKS)), dtype=np.float32)
+        for step in range(n_steps):
+            if step % steps_per_hour == 0:
+                p[:, visit_index] = base_visits * rng.lognormal(0.0, demand_noise, size=batch)
+            out[:, step, :3] = x
+            out[:, step, 3] = cash
+            cash = cash + dt * flow_rates(x, p)['cash_flow']
+            x = np.maximum(x + dt * derivatives(x, p), 0.0)
+        yield out
@@ -0,0 +1,218 @@
+/* Coffee Shop System - Vector Animation Player
+ * Plays the keyframe JSON written by vector_export.py into an <svg>.
+ * Objects that keep their shape size are tweened point by point; objects that
+ * appear or disappear fade in and out over their keyframe.
+ */
+(function () {
+    'use strict';
+
+    const SVG_NS = 'http://www.w3.org/2000/svg';
+
+    // Same easing as Manim's default rate function (smooth)
+    function smooth(t) {
+        const s = 1 / (1 + Math.exp(10 * 0.5 - 10 * t));
+        const s0 = 1 / (1 + Math.exp(5));
+        return Math.min(1, Math.max(0, (s - s0) / (1 - 2 * s0)));
+    }
+
+    function lerp(a, b, t) {
+        return a + (b - a) * t;
+    }
+
+    function lerpColor(a, b, t) {
+        if (a === b) return a;
+        const pa = parseInt(a.slice(1), 16);
+        const pb = parseInt(b.slice(1), 16);
+        let out = 0;
+        for (const shift of [16, 8, 0]) {
+            const ca = (pa >> shift) & 255;
+            const cb = (pb >> shift) & 255;
+            out |= Math.round(lerp(ca, cb, t)) << shift;
+        }
+        return '#' + out.toString(16).padStart(6, '0');
+    }
+
+    // Decode a version 2 path string into curves of 8 numbers (start, two handles, end)
+    function parsePath(d) {
+        const points = [];
+        const tokens = d.match(/[MLC]|-?\d+/g) || [];
+        let x = 0, y = 0, command = 'M';
+        for (let i = 0; i < tokens.length;) {
+            if (/[MLC]/.test(tokens[i])) {
+                command = tokens[i++];
+                continue;
+            }
+            const v = tokens.slice(i, i + (command === 'C' ? 6 : 2)).map(Number);
+            i += v.length;
+            if (command === 'M') {
+                x += v[0];
+                y += v[1];
+                command = 'L';  // As in SVG, pairs after a move are lines
+                continue;
+            }
+            const [dx, dy] = command === 'C' ? [v[4], v[5]] : v;
+            const handles = command === 'C' ? v.slice(0, 4) : [dx / 3, dy / 3, 2 * dx / 3, 2 * dy / 3];
+            points.push(x, y, x + handles[0], y + handles[1], x + handles[2], y + handles[3], x + dx, y + dy);
+            x += dx;
+            y += dy;
+        }
+        return points.map((v) => v / 1000);
+    }
+
+    function pathData(points) {
+        let d = '';
+        let lastX = null;
+        let lastY = null;
+        for (let i = 0; i < points.length; i += 8) {
+            const x0 = points[i], y0 = points[i + 1];
+            if (x0 !== lastX || y0 !== lastY) {
+                d += `M${x0} ${y0}`;
+            }
+            d += `C${points[i + 2]} ${points[i + 3]} ${points[i + 4]} ${points[i + 5]} ${points[i + 6]} ${points[i + 7]}`;
+            lastX = points[i + 6];
+            lastY = points[i + 7];
+        }
+        return d;
+    }
+
+    // Apply the delta-encoded keyframes to get the full state at the end of each one
+    function expandKeyframes(data) {
+        const states = [];
+        let state = {};
+        let order = [];
+        for (const keyframe of data.keyframes) {
+            const next = {};
+            if (keyframe.z) order = keyframe.z;
+            for (const id of order) {
+                const previous = state[id];
+                const change = (keyframe.set || {})[id];
+                if (!change) {
+                    next[id] = previous;
+                    continue;
+                }
+                const obj = Object.assign({}, previous, change);
+                if (typeof change.p === 'string') obj.p = parsePath(change.p);  // Version 1 used plain arrays
+                if (change.m) {
+                    const [dx, dy] = change.m;
+                    obj.p = previous.p.map((v, i) => v + (i % 2 === 0 ? dx : dy));
+                }
+                delete obj.m;
+                next[id] = obj;
+            }
+            states.push({ t: keyframe.t, d: keyframe.d, order: order, objects: next });
+            state = next;
+        }
+        return states;
+    }
+
+    class VectorPlayer {
+        constructor(svg, data) {
+            this.svg = svg;
+            this.data = data;
+            this.states = expandKeyframes(data);
+            this.paths = {};
+            this.current = -1;
+            this.playing = true;
+            this.elapsed = 0;
+            this.lastTick = null;
+
+            const w = data.width, h = data.height;
+            svg.setAttribute('viewBox', `${-w / 2} ${-h / 2} ${w} ${h}`);
+            svg.style.background = data.background;
+            svg.addEventListener('click', () => this.toggle());
+            requestAnimationFrame((now) => this.tick(now));
+        }
+
+        toggle() {
+            this.playing = !this.playing;
+        }
+
+        path(id) {
+            if (!this.paths[id]) {
+                const el = document.createElementNS(SVG_NS, 'path');
+                el.setAttribute('stroke-linejoin', 'round');
+                el.setAttribute('stroke-linecap', 'round');
+                this.paths[id] = el;
+            }
+            return this.paths[id];
+        }
+
+        draw(el, obj, fade) {
+            el.setAttribute('d', pathData(obj.p));
+            el.setAttribute('fill', obj.f);
+            el.setAttribute('fill-opacity', obj.fo * fade);
+            el.setAttribute('stroke', obj.s);
+            el.setAttribute('stroke-opacity', obj.so * fade);
+            el.setAttribute('stroke-width', obj.sw);
+        }
+
+        // Put the right paths in the SVG, in draw order, when entering keyframe k
+        enter(k) {
+            const state = this.states[k];
+            const before = k > 0 ? this.states[k - 1] : { order: [], objects: {} };
+            const ids = state.order.slice();
+            for (const id of before.order) {
+                if (!(id in state.objects)) ids.push(id);  // Leaving: keep drawing while fading out
+            }
+            this.svg.replaceChildren(...ids.map((id) => this.path(id)));
+            this.active = ids;
+            this.current = k;
+            this.frame(k, 0, true);
+        }
+
+        frame(k, t, full) {
+            const state = this.states[k];
+            const before = k > 0 ? this.states[k - 1].objects : {};
+            const a = smooth(t);
+            for (const id of this.active) {
+                const from = before[id];
+                const to = state.objects[id];
+                if (!full && from === to) continue;  // Unchanged during this keyframe
+                const el = this.paths[id];
+                if (!to) {
+                    this.draw(el, from, 1 - a);
+                } else if (!from) {
+                    this.draw(el, to, a);
+                } else if (from.p.length === to.p.length) {
+                    this.draw(el, {
+                        p: from.p.map((v, i) => lerp(v, to.p[i], a)),
+                        f: lerpColor(from.f, to.f, a),
+                        fo: lerp(from.fo, to.fo, a),
+                        s: lerpColor(from.s, to.s, a),
+                        so: lerp(from.so, to.so, a),
+                        sw: lerp(from.sw, to.sw, a),
+                    }, 1);
+                } else {
+                    // Shape changed size: snap to the new shape
+                    this.draw(el, a < 0.5 ? from : to, 1);
+                }
+            }
+        }
+
+        tick(now) {
+            if (this.lastTick !== null && this.playing) {
+                this.elapsed = (this.elapsed + (now - this.lastTick) / 1000) % this.data.duration;
+            }
+            this.lastTick = now;
+
+            // Last keyframe starting at or before the current time
+            let k = this.current > 0 && this.states[this.current].t <= this.elapsed ? this.current : 0;
+            while (k + 1 < this.states.length && this.states[k + 1].t <= this.elapsed) k++;
+            if (k !== this.current) this.enter(k);
+
+            const state = this.states[k];
+            const t = state.d > 0 ? Math.min(1, (this.elapsed - state.t) / state.d) : 1;
+            this.frame(k, t, false);
+            requestAnimationFrame((next) => this.tick(next));
+        }
+    }
+
+    function load(svg) {
+        fetch(svg.dataset.src)
+            .then((response) => response.json())
+            .then((data) => new VectorPlayer(svg, data))
+            .catch((error) => console.error('Could not load vector animation', error));
+    }
+
+    document.querySelectorAll('svg.vector-player').forEach(load);
+})();
@@ -0,0 +1,247 @@
+"""
+Vector Animation Export for Coffee Shop Scenes
+Runs a scene from scenes.py without rendering video and records its mobjects as
+keyframes (one before and one after every play/wait). Shapes and text are stored
+as cubic Bézier paths, so the result stays crisp at any size and skips ffmpeg.
+The JSON is played back by the vector player in templates/animation.html; a
+gzipped copy is written next to it for the app to serve.
+
+Format (coordinates in scene units, y pointing down):
+    {
+        "version": 2, "scene": "...", "width": 14.2, "height": 8, "background": "#000000",
+        "duration": 42.0,
+        "keyframes": [
+            {"t": start, "d": duration,
+             "z": [ids in draw order]          # only when the set/order of objects changed
+             "set": {id: {changed fields}}}    # p: path, m: [dx, dy] move, f/fo: fill, s/so/sw: stroke
+        ]
+    }
+"p" is a path string of integers in 1/1000 scene units, each pair relative to
+the previous end point: "M x y" starts a subpath, "L x y" is a straight segment
+and "C x1 y1 x2 y2 x y" a cubic Bézier curve. A command letter is left out when
+it repeats, and a minus sign doubles as separator, e.g. "M1200-350L100 0 0 80".
+
+Usage:
+    python vector_export.py FullSystemScene media/vector/FullSystemScene.json
+"""
+import argparse
+import gzip
+import json
+import os
+
+import numpy as np
+from manim import VMobject, config, tempconfig
+
+import scenes
+
+FORMAT_VERSION = 2
+
+# Decimal places kept for coordinates (scene units; the frame is ~14 units wide)
+PRECISION = 3
+
+# Manim's Cairo renderer draws stroke_width in hundredths of a scene unit
+STROKE_SCALE = 0.01
+
+
+def _numbers(values):
+    text = ''
+    for value in values:
+        text += str(value) if not text or value < 0 else f' {value}'
+    return text
+
+
+def _path_string(curves):
+    """Encode curves of shape (n, 8) in the compact relative path format."""
+    points = np.rint(curves * 10 ** PRECISION).astype(int).tolist()
+    parts = []
+    x = y = 0
+    command = None
+    for x0, y0, x1, y1, x2, y2, x3, y3 in points:
+        if command is None or (x0, y0) != (x, y):
+            parts.append('M' + _numbers([x0 - x, y0 - y]))
+            x, y, command = x0, y0, 'M'
+        # Lines come out of Manim as cubics with handles at a third and two thirds
+        straight = (abs(3 * x1 - 2 * x0 - x3) <= 3 and abs(3 * y1 - 2 * y0 - y3) <= 3 and
+                    abs(3 * x2 - x0 - 2 * x3) <= 3 and abs(3 * y2 - y0 - 2 * y3) <= 3)
+        if straight:
+            segment, values = 'L', [x3 - x, y3 - y]
+        else:
+            segment, values = 'C', [x1 - x, y1 - y, x2 - x, y2 - y, x3 - x, y3 - y]
+        numbers = _numbers(values)
+        if segment != command:
+            parts.append(segment + numbers)
+        else:
+            parts.append(numbers if numbers.startswith('-') else f' {numbers}')
+        x, y, command = x3, y3, segment
+    return ''.join(parts)
+
+
+def _hex(color):
+    """Hex string for a Manim color (ManimColor in newer releases, colour.Color in older)."""
+    if hasattr(color, 'to_hex'):
+        return color.to_hex().lower()[:7]
+    return color.hex_l
+
+
+class KeyframeRecorder:
+    """Collects delta-encoded keyframes of a scene's visible mobjects."""
+
+    def __init__(self):
+        self.keyframes = []
+        self.time = 0.0
+        self._ids = {}
+        self._keep_alive = []  # Stops id() values being reused by new mobjects
+        self._previous = {}
+        self._order = []
+
+    def _object_id(self, mobject):
+        key = id(mobject)
+        if key not in self._ids:
+            self._ids[key] = len(self._ids)
+            self._keep_alive.append(mobject)
+        return self._ids[key]
+
+    @staticmethod
+    def _serialize(mobject):
+        points = mobject.points
+        n_curves = len(points) // 4
+        curves = points[:n_curves * 4, :2].copy()
+        curves[:, 1] *= -1  # SVG y axis points down
+        return {
+            'p': np.round(curves.reshape(n_curves, 8), PRECISION) + 0.0,  # + 0.0 drops "-0.0"
+            'f': _hex(mobject.get_fill_color()),
+            'fo': round(float(mobject.get_fill_opacity()), 3),
+            's': _hex(mobject.get_stroke_color()),
+            'so': round(float(mobject.get_stroke_opacity()), 3),
+            'sw': round(float(mobject.get_stroke_width()) * STROKE_SCALE, 4),
+        }
+
+    def _snapshot(self, scene):
+        state = {}
+        order = []
+        for top_level in scene.mobjects:
+            for mobject in top_level.family_members_with_points():
+                if not isinstance(mobject, VMobject) or len(mobject.points) < 4:
+                    continue
+                object_id = self._object_id(mobject)
+                if object_id in state:
+                    continue
+                state[object_id] = self._serialize(mobject)
+                order.append(object_id)
+        return state, order
+
+    @staticmethod
+    def _delta(old, new):
+        """Fields of new that differ from old, using a move when only the position changed."""
+        if old is None:
+            changed = dict(new)
+            changed['p'] = _path_string(new['p'])
+            return changed
+        changed = {key: value for key, value in new.items() if key != 'p' and old[key] != value}
+        if old['p'].shape != new['p'].shape:
+            changed['p'] = _path_string(new['p'])
+        elif not np.array_equal(old['p'], new['p']):
+            offset = new['p'] - old['p']
+            dx, dy = offset[0, 0], offset[0, 1]
+            if np.allclose(offset[:, 0::2], dx, atol=10 ** -PRECISION) and \
+                    np.allclose(offset[:, 1::2], dy, atol=10 ** -PRECISION):
+                changed['m'] = [round(float(dx), PRECISION), round(float(dy), PRECISION)]
+                # The player applies the move to its own copy, so track what it will see
+                new['p'] = np.round(old['p'] + np.tile(offset[0, :2], 4), PRECISION)
+            else:
+                changed['p'] = _path_string(new['p'])
+        return changed
+
+    def capture(self, scene, duration):
+        """Record the scene's current state as the end of a segment lasting duration seconds."""
+        state, order = self._snapshot(scene)
+        changes = {}
+        for object_id, serialized in state.items():
+            delta = self._delta(self._previous.get(object_id), serialized)
+            if delta:
+                changes[str(object_id)] = delta
+
+        if duration > 0 or changes or order != self._order:
+            keyframe = {'t': round(self.time, 3), 'd': round(duration, 3)}
+            if order != self._order:
+                keyframe['z'] = order
+            if changes:
+                keyframe['set'] = changes
+            self.keyframes.append(keyframe)
+
+        self._previous = state
+        self._order = order
+        self.time += duration
+
+    def to_dict(self, scene_name):
+        return {
+            'version': FORMAT_VERSION,
+            'scene': scene_name,
+            'width': round(config.frame_width, 4),
+            'height': round(config.frame_height, 4),
+            'background': _hex(config.background_color),
+            'duration': round(self.time, 3),
+            'keyframes': self.keyframes,
+        }
+
+
+def recording_scene(base):
+    """Subclass of a scene that feeds every play/wait into a KeyframeRecorder."""
+
+    class RecordingScene(base):
+        def setup(self):
+            super().setup()
+            self.recorder = KeyframeRecorder()
+
+        def play(self, *args, **kwargs):
+            # Mobjects added with self.add() since the last play appear instantly
+            self.recorder.capture(self, 0)
+            super().play(*args, **kwargs)
+            # Run time of this play (or wait, which plays a Wait animation)
+            self.recorder.capture(self, self.duration)
+
+    RecordingScene.__name__ = base.__name__
+    return RecordingScene
+
+
+def export_scene(scene_name, output_path):
+    """Run scene_name from scenes.py without writing video and save its vector animation."""
+    base = getattr(scenes, scene_name, None)
+    if base is None:
+        raise ValueError(f"Unknown scene {scene_name!r}")
+
+    # dry_run computes the animation but writes no frames or movie; a low frame
+    # rate and a small 16:9 camera keep the (discarded) frame rendering cheap
+    # without changing the frame size in scene units
+    with tempconfig({'dry_run': True, 'frame_rate': 5, 'pixel_width': 256, 'pixel_height': 144,
+                     'disable_caching': True, 'verbosity': 'WARNING', 'progress_bar': 'none'}):
+        scene = recording_scene(base)()
+        scene.render()
+        data = scene.recorder.to_dict(scene_name)
+    if data['keyframes'] and not data['duration']:
+        raise RuntimeError(f"{scene_name} recorded no play time; is Scene.duration set by this Manim version?")
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    # The gzipped copy goes first, so a served .json always has a matching .gz
+    for path, content in ((f'{output_path}.gz', gzip.compress(payload, 9)), (output_path, payload)):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    return output_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a scene as a vector animation (JSON).")
+    parser.add_argument('scene', help="Scene class name in scenes.py")
+    parser.add_argument('output', help="Path of the JSON file to write")
+    args = parser.parse_args(argv)
+
+    path = export_scene(args.scene, args.output)
+    print(f"Exported {args.scene} to {path} ({os.path.getsize(path) / 1024:.1f} KB, "
+          f"{os.path.getsize(path + '.gz') / 1024:.1f} KB gzipped)")
+
+
+if __name__ == '__main__':
+    main()